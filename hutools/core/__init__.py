@@ -11,7 +11,7 @@
 """
 from six import text_type
 
-from .decode import unidecode
+from .decode import unidecode, unidecode_many
 from .factory import MockHelper
 from .kerberos import Kerberos
 from .processor import DataHand, HtmlHand, JsonHand
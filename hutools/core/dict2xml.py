@@ -0,0 +1,269 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  dict2xml.py
+@Time    :  2026/10/19 9:30 PM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  流式dict转xml, 边遍历边写入文件或缓冲区, 输出与dicttoxml(ids=False)逐字节一致
+"""
+import io
+import numbers
+import re
+import xml.dom.minidom
+from collections.abc import Iterable
+from functools import lru_cache
+
+__all__ = ["XmlWriter", "dump_xml", "dumps_xml", "escape_xml"]
+
+# 纯ASCII且不以xml开头的名称一定合法, 其余名称再交给解析器校验
+_SIMPLE_NAME = re.compile(r"(?!(?i:xml))[A-Za-z_][A-Za-z0-9_.\-]*\Z")
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+def default_item_func(parent):
+    return "item"
+
+
+def escape_xml(value):
+    """转义文本中的&"'<>, 非字符串原样返回"""
+    if type(value) is str:
+        return value.replace("&", "&amp;").replace('"', "&quot;").replace("'", "&apos;") \
+            .replace("<", "&lt;").replace(">", "&gt;")
+    return value
+
+
+def _wrap_cdata(value):
+    return "<![CDATA[" + str(value).replace("]]>", "]]]]><![CDATA[>") + "]]>"
+
+
+def _is_valid_name(name):
+    if _SIMPLE_NAME.match(name):
+        return True
+    try:
+        xml.dom.minidom.parseString('<?xml version="1.0" encoding="UTF-8" ?><%s>foo</%s>' % (name, name))
+        return True
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _make_name(key):
+    """
+    与dicttoxml.make_valid_xml_name的规则一致: 数字前加n, 空格替换为下划线, 仍不合法时改为<key name="...">
+    Returns:
+        tuple: (标签名, name属性值或None)
+    """
+    key = escape_xml(key)
+    if _is_valid_name("%s" % (key,)):
+        return "%s" % (key,), None
+    if str(key).isdigit():
+        return "n%s" % (key,), None
+    try:
+        return "n%s" % (float(str(key)),), None
+    except ValueError:
+        pass
+    if _is_valid_name(key.replace(" ", "_")):
+        return key.replace(" ", "_"), None
+    return "key", key
+
+
+def _get_xml_type(value):
+    if value is None:
+        return "null"
+    if type(value) is bool:
+        return "bool"
+    if type(value) is str:
+        return "str"
+    if type(value) is int:
+        return "int"
+    if type(value) is float:
+        return "float"
+    if isinstance(value, numbers.Number):
+        return "number"
+    if isinstance(value, dict):
+        return "dict"
+    if isinstance(value, Iterable):
+        return "list"
+    return type(value).__name__
+
+
+class XmlWriter(object):
+    """
+    流式xml序列化, 不构建DOM树, 按块写入目标文件, 选项与dicttoxml保持一致
+    Examples:
+        >>> with open("data.xml", "wb") as f:
+        ...     XmlWriter(custom_root="Data", attr_type=False).dump({"Part": [{"PartNumber": 1}]}, f)
+        >>> XmlWriter(attr_type=False).dumps({"a": 1})
+        b'<?xml version="1.0" encoding="UTF-8" ?><root><a>1</a></root>'
+    """
+
+    def __init__(self, root=True, custom_root="root", xml_declaration=True, attr_type=True,
+                 item_func=default_item_func, cdata=False, include_encoding=True, encoding="UTF-8",
+                 buffer_size=DEFAULT_BUFFER_SIZE):
+        """初始化
+        :param root(bool): 是否包裹根节点
+        :param custom_root(str): 根节点名称
+        :param xml_declaration(bool): 是否输出xml声明
+        :param attr_type(bool): 是否输出type属性
+        :param item_func(callable): 根据父节点名称生成列表元素的标签名
+        :param cdata(bool): 字符串是否使用CDATA包裹
+        :param include_encoding(bool): xml声明中是否包含encoding
+        :param encoding(str): 声明及写入二进制文件时使用的编码
+        :param buffer_size(int): 攒够多少个字符后写入一次目标文件
+        """
+        self.root = root
+        self.custom_root = custom_root
+        self.xml_declaration = xml_declaration
+        self.attr_type = attr_type
+        self.item_func = item_func
+        self.cdata = cdata
+        self.include_encoding = include_encoding
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+
+    def _attrs(self, name_attr, value=None, typed=False):
+        attrs = ''
+        if name_attr is not None:
+            attrs = ' name="%s"' % name_attr
+        if typed and self.attr_type:
+            attrs += ' type="%s"' % _get_xml_type(value)
+        return attrs
+
+    def _scalar(self, tag, value, name_attr=None, bool_as_text=False):
+        """数字/字符串/日期/布尔/None节点, tag会再次按xml名称规则修正"""
+        key, extra = _make_name(tag)
+        if extra is not None:
+            name_attr = extra
+        if hasattr(value, "isoformat") and not isinstance(value, (numbers.Number, str)):
+            value = value.isoformat()
+        attrs = self._attrs(name_attr, value, True)
+        if value is None:
+            return "<%s%s></%s>" % (key, attrs, key)
+        if type(value) is bool and not bool_as_text:
+            return "<%s%s>%s</%s>" % (key, attrs, str(value).lower(), key)
+        text = _wrap_cdata(value) if self.cdata else escape_xml(value)
+        return "<%s%s>%s</%s>" % (key, attrs, text, key)
+
+    @staticmethod
+    def _is_scalar(value):
+        return isinstance(value, numbers.Number) or type(value) is str or hasattr(value, "isoformat")
+
+    def iterencode(self, obj):
+        """
+        逐段产出xml字符串, 使用显式栈遍历, 嵌套层级不受递归深度限制
+        Args:
+            obj: dict/list等可迭代对象或标量
+
+        Returns:
+            生成器
+        """
+        if self.root:
+            if self.xml_declaration:
+                if self.include_encoding:
+                    yield '<?xml version="1.0" encoding="%s" ?>' % self.encoding
+                else:
+                    yield '<?xml version="1.0" ?>'
+            yield "<%s>" % self.custom_root
+            parent = self.custom_root
+        else:
+            parent = ""
+
+        stack = []
+        if type(obj) is bool or obj is None or self._is_scalar(obj):
+            yield self._scalar(self.item_func(parent), obj)
+        elif isinstance(obj, dict):
+            stack.append((True, iter(obj.items()), None, None))
+        elif isinstance(obj, Iterable):
+            stack.append((False, iter(obj), self.item_func(parent), None))
+        else:
+            raise TypeError('Unsupported data type: %s (%s)' % (obj, type(obj).__name__))
+
+        while stack:
+            is_dict, items, item_name, close = stack[-1]
+            for entry in items:
+                break
+            else:
+                stack.pop()
+                if close is not None:
+                    yield close
+                continue
+
+            if is_dict:
+                tag, name_attr = _make_name(entry[0])
+                value = entry[1]
+                if type(value) is bool or value is None or self._is_scalar(value):
+                    yield self._scalar(tag, value, name_attr)
+                elif isinstance(value, dict):
+                    yield "<%s%s>" % (tag, self._attrs(name_attr, value, True))
+                    stack.append((True, iter(value.items()), None, "</%s>" % tag))
+                elif isinstance(value, Iterable):
+                    yield "<%s%s>" % (tag, self._attrs(name_attr, value, True))
+                    stack.append((False, iter(value), self.item_func(tag), "</%s>" % tag))
+                else:
+                    raise TypeError('Unsupported data type: %s (%s)' % (value, type(value).__name__))
+            else:
+                # 与dicttoxml一致: 列表中的bool按数字处理(输出True/False), 容器元素的标签名不做修正
+                if self._is_scalar(entry) or entry is None:
+                    yield self._scalar(item_name, entry, bool_as_text=True)
+                elif isinstance(entry, dict):
+                    yield '<%s type="dict">' % item_name if self.attr_type else "<%s>" % item_name
+                    stack.append((True, iter(entry.items()), None, "</%s>" % item_name))
+                elif isinstance(entry, Iterable):
+                    yield '<%s type="list">' % item_name if self.attr_type else "<%s >" % item_name
+                    stack.append((False, iter(entry), self.item_func(item_name), "</%s>" % item_name))
+                else:
+                    raise TypeError('Unsupported data type: %s (%s)' % (entry, type(entry).__name__))
+
+        if self.root:
+            yield "</%s>" % self.custom_root
+
+    def _iter_chunks(self, obj):
+        """把细粒度的片段合并成约buffer_size大小的块"""
+        parts = []
+        size = 0
+        for part in self.iterencode(obj):
+            parts.append(part)
+            size += len(part)
+            if size >= self.buffer_size:
+                yield "".join(parts)
+                parts = []
+                size = 0
+        if parts:
+            yield "".join(parts)
+
+    def dump(self, obj, fp):
+        """
+        写入文件对象, 文本文件直接写入字符串, 其它按encoding编码后写入
+        Args:
+            obj: 需要序列化的对象
+            fp: 带write方法的对象
+
+        Returns:
+
+        """
+        text_mode = isinstance(fp, io.TextIOBase)
+        for chunk in self._iter_chunks(obj):
+            fp.write(chunk if text_mode else chunk.encode(self.encoding))
+
+    def dumps(self, obj, return_bytes=True):
+        """序列化为bytes(与dicttoxml一致, 按utf-8编码)或str"""
+        text = "".join(self._iter_chunks(obj))
+        return text.encode("utf-8") if return_bytes else text
+
+
+def dump_xml(obj, fp, **options):
+    """
+    流式写入xml
+    Examples:
+        >>> with open("data.xml", "wb") as f:
+        ...     dump_xml(data, f, custom_root="Data", attr_type=False)
+    """
+    XmlWriter(**options).dump(obj, fp)
+
+
+def dumps_xml(obj, return_bytes=True, **options):
+    """dicttoxml.dicttoxml的替代, 参数一致(不支持ids)"""
+    return XmlWriter(**options).dumps(obj, return_bytes)
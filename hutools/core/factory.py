@@ -12,12 +12,58 @@
 import random
 import re
 import string
-
-from faker import Faker
+import threading
+from functools import lru_cache
 
 from hutools.time.moment import Moment
 
-fake = Faker(['zh_CN'])
+DEFAULT_LOCALE = "zh_CN"
+
+_fakers = {}
+_faker_lock = threading.Lock()
+
+
+def get_faker(locale=None):
+    """
+    按locale获取Faker实例, 首次使用时才导入faker并加载对应的provider, 之后复用
+    Args:
+        locale: 如zh_CN/en_US, 默认为DEFAULT_LOCALE
+
+    Returns:
+        Faker
+    Examples:
+        >>> get_faker().name()
+        >>> get_faker("en_US").name()
+    """
+    locale = locale or DEFAULT_LOCALE
+    faker = _fakers.get(locale)
+    if faker is None:
+        with _faker_lock:
+            faker = _fakers.get(locale)
+            if faker is None:
+                from faker import Faker
+                faker = _fakers[locale] = Faker([locale])
+    return faker
+
+
+def __getattr__(name):
+    """兼容旧的模块级fake对象, 访问时才创建"""
+    if name == "fake":
+        return get_faker()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+_RAND_VARS = re.compile("\\$\\{rand_(.*)\\((.*)\\)\\}")
+_RAND_NO_VARS = re.compile("\\$\\{rand_(.*)\\}")
+_DYNAMIC_VARS = re.compile("\\$\\{get(.*)\\((.*)\\)\\}")
+_OWN_VARS = re.compile("\\{\\{(.*)\\}\\}")
+_EXTRACT_VARS = re.compile("\\$var_(.*)")
+_LOCK_VARS = re.compile("\\$enc_(.*)")
+
+
+def _cite_params(value):
+    """逗号分隔的参数, 纯数字按字面量求值"""
+    return [eval(x) if x.strip().isdigit() else x for x in value.split(",")]
 
 
 class MockHelper:
@@ -301,7 +347,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_name()
         """
-        return fake.name()
+        return get_faker().name()
 
     @staticmethod
     def rand_address():
@@ -311,7 +357,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_address()
         """
-        return fake.address()
+        return get_faker().address()
 
     @staticmethod
     def rand_country():
@@ -321,7 +367,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_country()
         """
-        return fake.country()
+        return get_faker().country()
 
     @staticmethod
     def rand_country_code():
@@ -331,7 +377,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_country_code()
         """
-        return "".join(fake.country_code())
+        return "".join(get_faker().country_code())
 
     @staticmethod
     def rand_city_name():
@@ -341,7 +387,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_city_name()
         """
-        return fake.city_name()
+        return get_faker().city_name()
 
     @staticmethod
     def rand_city():
@@ -351,7 +397,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_city()
         """
-        return fake.city()
+        return get_faker().city()
 
     @staticmethod
     def rand_province():
@@ -361,7 +407,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_province()
         """
-        return fake.province()
+        return get_faker().province()
 
     @staticmethod
     def rand_email():
@@ -371,7 +417,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_email()
         """
-        return fake.email()
+        return get_faker().email()
 
     @staticmethod
     def rand_ipv4():
@@ -381,7 +427,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_ipv4()
         """
-        return fake.ipv4()
+        return get_faker().ipv4()
 
     @staticmethod
     def rand_license_plate():
@@ -391,7 +437,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_license_plate()
         """
-        return fake.license_plate()
+        return get_faker().license_plate()
 
     @staticmethod
     def rand_color():
@@ -401,7 +447,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_color()
         """
-        return fake.rgb_color()
+        return get_faker().rgb_color()
 
     @staticmethod
     def rand_safe_hex_color():
@@ -411,7 +457,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_safe_hex_color()
         """
-        return fake.safe_hex_color()
+        return get_faker().safe_hex_color()
 
     @staticmethod
     def rand_color_name():
@@ -421,7 +467,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_color_name()
         """
-        return fake.color_name()
+        return get_faker().color_name()
 
     @staticmethod
     def rand_company_name():
@@ -431,7 +477,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_company_name()
         """
-        return fake.company()
+        return get_faker().company()
 
     @staticmethod
     def rand_job():
@@ -441,7 +487,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_job()
         """
-        return fake.job()
+        return get_faker().job()
 
     @staticmethod
     def rand_pwd(
@@ -456,7 +502,7 @@ class MockHelper:
         length:
         Returns:
         """
-        return fake.password(
+        return get_faker().password(
             length=length,
             special_chars=special_chars,
             digits=digits,
@@ -472,7 +518,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_uuid4()
         """
-        return fake.uuid4()
+        return get_faker().uuid4()
 
     @staticmethod
     def rand_sha1(raw_output=False):
@@ -482,7 +528,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_sha1()
         """
-        return fake.sha1(raw_output=raw_output)
+        return get_faker().sha1(raw_output=raw_output)
 
     @staticmethod
     def rand_md5(raw_output=False):
@@ -496,7 +542,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_md5()
         """
-        return fake.md5(raw_output=raw_output)
+        return get_faker().md5(raw_output=raw_output)
 
     @staticmethod
     def rand_female():
@@ -507,7 +553,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_female()
         """
-        return fake.name_female()
+        return get_faker().name_female()
 
     @staticmethod
     def rand_male():
@@ -517,7 +563,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_male()
         """
-        return fake.name_male()
+        return get_faker().name_male()
 
     @staticmethod
     def rand_user_info(sex=None):
@@ -531,7 +577,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_user_info()
         """
-        return fake.simple_profile(sex=sex)
+        return get_faker().simple_profile(sex=sex)
 
     @staticmethod
     def rand_user_info_pro(fields=None, sex=None):
@@ -546,7 +592,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_user_info_pro()
         """
-        return fake.profile(fields=fields, sex=sex)
+        return get_faker().profile(fields=fields, sex=sex)
 
     @staticmethod
     def rand_user_agent():
@@ -557,7 +603,7 @@ class MockHelper:
         Examples:
             >>> MockHelper.rand_user_agent()
         """
-        return fake.user_agent()
+        return get_faker().user_agent()
 
     @staticmethod
     def get_user_vars(target_key=None):
@@ -638,17 +684,18 @@ class MockHelper:
             >>> MockHelper.cite("$var_test_001")
             >>> MockHelper.cite('$enc_(base64_encode,base64参数加密)')
         """
-        # fix: file "d:\program files\python37\lib\re.py", line 173, in match
-        # return _compile(pattern, flags).match(string)
-        # typeerror: expected string or bytes-like object
-        rand_vars = re.match("\\$\\{rand_(.*)\\((.*)\\)\\}", str(name))  # 带参数
-        rand_no_vars = re.match("\\$\\{rand_(.*)\\}", str(name))  # 无参数
-        dynamic_vars = re.match("\\$\\{get(.*)\\((.*)\\)\\}", str(name))  # 动态自定义
-        own_vars = re.match("\\{\\{(.*)\\}\\}", str(name))  # 动态自定义
-        extract_vars = re.match("\\$var_(.*)", str(name).upper())  # 后置提取参数
-        lock_vars = re.match("\\$enc_(.*)", str(name))  # 带参数
-        pattern = rand_vars if rand_vars is not None else dynamic_vars
-        func_dict = {
+        func, args = MockHelper.resolve(name)
+        return args if func is None else func(*args)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def func_dict():
+        """
+        cite支持的函数, 只构建一次
+        Returns:
+            dict: {函数名: 函数}
+        """
+        return {
             "int_number": MockHelper.rand_int_number,
             "float_number": MockHelper.rand_float_number,
             "compute_time": MockHelper.rand_compute_time,
@@ -683,34 +730,81 @@ class MockHelper:
             "user_vars": MockHelper.get_user_vars,
             "encrypt_vars": MockHelper.get_encrypt_vars,
         }
+
+    @staticmethod
+    def resolve(name):
+        """
+        解析cite的占位符, 规则与cite一致, 只解析不调用
+        Args:
+            name: 占位符或原始值
+        Returns:
+            tuple: (函数, 参数元组); 不需要调用函数时为(None, 原样返回的值)
+        Examples:
+            >>> MockHelper.resolve('${rand_int_number(1,55)}')
+            >>> MockHelper.resolve("{{custom_null_var}}")
+        """
+        text = str(name)
+        pattern = _RAND_VARS.match(text)  # 带参数
+        if pattern is None:
+            pattern = _DYNAMIC_VARS.match(text)  # 动态自定义
         if pattern is not None:
             key, value = pattern.groups()
-            if func_dict.get(key):
-                func = func_dict[key]
-                _param = [
-                    eval(x) if x.strip().isdigit() else x for x in value.split(",")
-                ]
-                if len(_param) >= 1 and "" not in _param:
-                    return func.__call__(*_param)
-                elif "" in _param:
-                    return func.__call__()  # 没有带参数的
-        elif own_vars:
-            return MockHelper.cite(MockHelper.get_user_vars(own_vars.group().strip("{}")))
-        elif extract_vars:
-            return MockHelper.get_encrypt_vars(extract_vars.group())
-        elif rand_no_vars:
-            return func_dict[rand_no_vars.group().strip("${rand_}")].__call__()
-        elif lock_vars:
-            _lock_param = [
-                eval(x) if x.strip().isdigit() else x
-                for x in lock_vars.group().strip("$enc_()").split(",")
-            ]
+            func = MockHelper.func_dict().get(key)
+            if not func:
+                return None, None
+            _param = _cite_params(value)
+            if len(_param) >= 1 and "" not in _param:
+                return func, tuple(_param)
+            return func, ()  # 没有带参数的
+        own_vars = _OWN_VARS.match(text)  # 动态自定义
+        if own_vars:
+            return MockHelper.resolve(MockHelper.get_user_vars(own_vars.group().strip("{}")))
+        extract_vars = _EXTRACT_VARS.match(text.upper())  # 后置提取参数
+        if extract_vars:
+            return None, MockHelper.get_encrypt_vars(extract_vars.group())
+        rand_no_vars = _RAND_NO_VARS.match(text)  # 无参数
+        if rand_no_vars:
+            return MockHelper.func_dict()[rand_no_vars.group().strip("${rand_}")], ()
+        lock_vars = _LOCK_VARS.match(text)  # 带参数
+        if lock_vars:
+            _lock_param = _cite_params(lock_vars.group().strip("$enc_()"))
             if len(_lock_param) < 2:
                 raise IndexError(_lock_param)
-            else:
-                return MockHelper.set_encrypt_vars.__call__(*_lock_param)
-        else:
-            return name  # 函数名不存在返回原始值
+            return MockHelper.set_encrypt_vars, tuple(_lock_param)
+        return None, name  # 函数名不存在返回原始值
+
+    @staticmethod
+    def compile(template):
+        """
+        预编译模板, 每个占位符只解析一次, 之后可以反复生成数据
+        Args:
+            template: 与comb_data相同的dict模板, 不会被修改
+        Returns:
+            MockTemplate
+        Examples:
+            >>> plan = MockHelper.compile({"id": "${rand_int_number(1,55)}", "name": "${rand_name()}"})
+            >>> plan.render()
+            >>> plan.render_many(1000)
+        """
+        return MockTemplate(template)
+
+    @staticmethod
+    def generate(schema, count, seed=None, **options):
+        """
+        按列批量生成数据, 详见hutools.core.mockdata
+        Args:
+            schema: {列名: 类型名 或 {"type": 类型名, 参数...}}, 类型见mockdata.COLUMN_TYPES
+            count: 行数
+            seed: 种子, 相同参数下生成的数据完全一致
+            options: shard/offset/batch_size/use_numpy
+        Returns:
+            dict: {列名: [值, ...]}
+        Examples:
+            >>> MockHelper.generate({"id": "sequence", "mobile": "mobile_number", "mail": "mail",
+            ...                      "age": {"type": "int_number", "min_value": 18, "max_value": 60}}, 1000, seed=1)
+        """
+        from hutools.core import mockdata
+        return mockdata.generate(schema, count, seed, **options)
 
     @staticmethod
     def comb_data(dict_map: dict) -> dict:
@@ -738,3 +832,69 @@ class MockHelper:
             return dict_map
         elif dict_map is None:  # fix：为空的时候raise 异常导致其它函数调用失败
             pass
+
+
+class MockTemplate:
+    """
+    MockHelper.compile的结果, 模板在编译时解析为生成函数, 每次render都返回新的dict;
+    生成规则与comb_data一致(列表中只有dict元素会被处理, 其它元素为None), 但不会修改原模板
+    Examples:
+        >>> plan = MockTemplate({"product": {"brand_id": "{{int}}", "category_id": "${rand_float_number(1,2,3)}"}})
+        >>> plan.render()
+        >>> plan.render_many(3)
+    """
+
+    def __init__(self, template):
+        self.template = template
+        self._render = self._compile(template) if isinstance(template, dict) else None
+
+    @classmethod
+    def _compile(cls, template):
+        entries = []
+        for key, value in template.items():
+            if isinstance(value, list):
+                items = [cls._compile(item) if isinstance(item, dict) else None for item in value]
+                entries.append((key, cls._compile_list(items), None))
+            elif isinstance(value, dict):
+                entries.append((key, cls._compile(value), None))
+            else:
+                func, args = MockHelper.resolve(value)
+                if func is None:
+                    entries.append((key, None, args))
+                elif args:
+                    entries.append((key, lambda func=func, args=args: func(*args), None))
+                else:
+                    entries.append((key, func, None))
+
+        def render():
+            return {key: value if func is None else func() for key, func, value in entries}
+
+        return render
+
+    @staticmethod
+    def _compile_list(items):
+        def render():
+            return [None if item is None else item() for item in items]
+
+        return render
+
+    def render(self):
+        """
+        生成一条数据
+        Returns:
+            dict, 模板不是dict时为None
+        """
+        return None if self._render is None else self._render()
+
+    def render_many(self, count):
+        """
+        生成多条数据
+        Args:
+            count: 数量
+        Returns:
+            list
+        """
+        render = self._render
+        if render is None:
+            return [None] * count
+        return [render() for _ in range(count)]
@@ -0,0 +1,476 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  mockdata.py
+@Time    :  2026/10/19 11:55 PM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  按列批量生成mock数据, 每列一次生成一批值, 支持固定种子复现及输出NDJSON/CSV
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+import string
+import sys
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from hutools.core.factory import DEFAULT_LOCALE
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ["COLUMN_TYPES", "generate", "iter_batches", "iter_rows", "write_ndjson", "write_csv", "dump", "split_shards",
+           "write_shards"]
+
+DEFAULT_BATCH_SIZE = 10000
+DEFAULT_SHARD_SIZE = 1000000
+
+_EMAIL_TYPES = ["@126.com", "@163.com", "@sina.com", "@sohu.com", "@yahoo.com.cn", "@gmail.com", "@yahoo.com"]
+# 与rand_mail一致: 一半概率为字母, 一半概率为0/1
+_MAIL_CHARS = list(string.ascii_letters) + ["0", "1"]
+_MAIL_CUM_WEIGHTS = list(range(1, 53)) + [78, 104]
+_PHONE_PREFIXES = ["134", "135", "136", "137", "138", "139", "147", "150", "151", "152", "157", "158", "159", "182",
+                   "187", "188", "130", "131", "132", "145", "155", "156", "185", "186", "145", "133", "153", "180",
+                   "181", "189"]
+_VERIFY_CODE_CHARS = string.digits + string.ascii_uppercase + string.ascii_lowercase
+
+# faker列专用的Faker实例, 不与factory.get_faker共享; 生成期间会替换实例的随机数发生器, 需持有_faker_lock
+_fakers = {}
+_faker_lock = threading.Lock()
+
+
+def field_seed(seed, shard, name):
+    """
+    每个分片每列独立的种子, 由(seed, 分片序号, 列名)确定, 与进程、PYTHONHASHSEED无关
+    Returns:
+        int: 64位整数
+    """
+    key = ("%s:%s:%s" % (seed, shard, name)).encode("utf-8")
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big")
+
+
+def _random_strings(rnd, count, alphabet, length):
+    """一次生成count*length个字符再切分"""
+    text = "".join(rnd.choices(alphabet, k=count * length))
+    return [text[i:i + length] for i in range(0, count * length, length)]
+
+
+def _numpy_strings(rng, count, alphabet, length):
+    chars = numpy.array(list(alphabet), dtype="<U1")
+    picked = chars[rng.integers(0, len(alphabet), size=(count, length))]
+    return picked.view("<U%d" % length).ravel().tolist() if length else [""] * count
+
+
+def _int_number(rnd, count, start, min_value=0, max_value=9999, step=1):
+    return rnd.choices(range(min_value, max_value + 1, step), k=count)
+
+
+def _float_number(rnd, count, start, start_num=0, end_num=9, accuracy=1):
+    low, high = sorted((start_num, end_num))
+    uniform = rnd.uniform
+    return [round(uniform(low, high), accuracy) for _ in range(count)]
+
+
+def _lowercase_letter(rnd, count, start, length=10):
+    return _random_strings(rnd, count, string.ascii_lowercase, length)
+
+
+def _uppercase_letter(rnd, count, start, length=10):
+    return _random_strings(rnd, count, string.ascii_uppercase, length)
+
+
+def _sample(rnd, count, start, length=10):
+    return _random_strings(rnd, count, string.ascii_letters + string.digits, length)
+
+
+def _digits(rnd, count, start, length=8):
+    return _random_strings(rnd, count, string.digits, length)
+
+
+def _mail(rnd, count, start, email_type=None, max_num=None):
+    types = [email_type] * count if email_type else rnd.choices(_EMAIL_TYPES, k=count)
+    lengths = [max_num] * count if max_num else rnd.choices(range(5, 11), k=count)
+    chars = "".join(rnd.choices(_MAIL_CHARS, cum_weights=_MAIL_CUM_WEIGHTS, k=sum(lengths)))
+    result, pos = [], 0
+    for length, suffix in zip(lengths, types):
+        result.append(chars[pos:pos + length] + suffix)
+        pos += length
+    return result
+
+
+def _mobile_number(rnd, count, start):
+    prefixes = rnd.choices(_PHONE_PREFIXES, k=count)
+    return [prefix + tail for prefix, tail in zip(prefixes, _random_strings(rnd, count, string.digits, 8))]
+
+
+def _verify_code(rnd, count, start, max_num=6):
+    sample = rnd.sample
+    return ["".join(sample(_VERIFY_CODE_CHARS, max_num)) for _ in range(count)]
+
+
+def _uuid4(rnd, count, start):
+    getrandbits = rnd.getrandbits
+    return [str(uuid.UUID(int=getrandbits(128), version=4)) for _ in range(count)]
+
+
+def _md5(rnd, count, start):
+    getrandbits = rnd.getrandbits
+    return ["%032x" % getrandbits(128) for _ in range(count)]
+
+
+def _sha1(rnd, count, start):
+    getrandbits = rnd.getrandbits
+    return ["%040x" % getrandbits(160) for _ in range(count)]
+
+
+def _choice(rnd, count, start, values=(), weights=None):
+    return rnd.choices(values, weights=weights, k=count)
+
+
+def _bool(rnd, count, start, probability=0.5):
+    rand = rnd.random
+    return [rand() < probability for _ in range(count)]
+
+
+def _sequence(rnd, count, start, begin=1, step=1):
+    first = begin + start * step
+    return list(range(first, first + count * step, step))
+
+
+def _const(rnd, count, start, value=None):
+    return [value] * count
+
+
+def _get_faker(locale):
+    """按locale获取本模块专用的Faker实例, 调用方需持有_faker_lock"""
+    locale = locale or DEFAULT_LOCALE
+    faker = _fakers.get(locale)
+    if faker is None:
+        from faker import Faker
+        faker = _fakers[locale] = Faker([locale])
+    return faker
+
+
+def _faker(rnd, count, start, method="name", locale=None, args=(), kwargs=None):
+    """调用Faker的方法, 生成期间把Faker的随机数发生器替换为本列的发生器"""
+    kwargs = kwargs or {}
+    with _faker_lock:
+        faker = _get_faker(locale)
+        func = getattr(faker, method)
+        old_random = faker.random
+        faker.random = rnd
+        try:
+            return [func(*args, **kwargs) for _ in range(count)]
+        finally:
+            faker.random = old_random
+
+
+def _numpy_int_number(rng, count, start, min_value=0, max_value=9999, step=1):
+    return (rng.integers(0, len(range(min_value, max_value + 1, step)), size=count) * step + min_value).tolist()
+
+
+def _numpy_float_number(rng, count, start, start_num=0, end_num=9, accuracy=1):
+    low, high = sorted((start_num, end_num))
+    return numpy.round(rng.uniform(low, high, size=count), accuracy).tolist()
+
+
+def _numpy_choice(rng, count, start, values=(), weights=None):
+    if weights is not None:
+        weights = numpy.asarray(weights, dtype=float)
+        weights = weights / weights.sum()
+    return [values[i] for i in rng.choice(len(values), size=count, p=weights).tolist()]
+
+
+def _numpy_bool(rng, count, start, probability=0.5):
+    return (rng.random(size=count) < probability).tolist()
+
+
+def _numpy_text(alphabet, default_length):
+    def generate_text(rng, count, start, length=default_length):
+        return _numpy_strings(rng, count, alphabet, length)
+
+    return generate_text
+
+
+# 列类型: 函数(随机数发生器, 本批数量, 本批第一行在整个数据集中的序号, **参数) -> list
+COLUMN_TYPES = {
+    "int_number": _int_number,
+    "float_number": _float_number,
+    "lowercase_letter": _lowercase_letter,
+    "uppercase_letter": _uppercase_letter,
+    "sample": _sample,
+    "digits": _digits,
+    "mail": _mail,
+    "mobile_number": _mobile_number,
+    "verify_code": _verify_code,
+    "uuid4": _uuid4,
+    "md5": _md5,
+    "sha1": _sha1,
+    "choice": _choice,
+    "bool": _bool,
+    "sequence": _sequence,
+    "const": _const,
+    "faker": _faker,
+}
+
+# 安装了numpy且use_numpy=True时使用的实现, 其余类型仍使用random
+_NUMPY_COLUMN_TYPES = {
+    "int_number": _numpy_int_number,
+    "float_number": _numpy_float_number,
+    "lowercase_letter": _numpy_text(string.ascii_lowercase, 10),
+    "uppercase_letter": _numpy_text(string.ascii_uppercase, 10),
+    "sample": _numpy_text(string.ascii_letters + string.digits, 10),
+    "digits": _numpy_text(string.digits, 8),
+    "choice": _numpy_choice,
+    "bool": _numpy_bool,
+}
+
+
+def _parse_schema(schema):
+    """
+    schema: {列名: 类型名 或 {"type": 类型名, 参数...}}
+    Returns:
+        list: [(列名, 类型名, 参数)]
+    """
+    fields = []
+    for name, spec in schema.items():
+        if isinstance(spec, str):
+            kind, params = spec, {}
+        elif isinstance(spec, dict):
+            params = dict(spec)
+            kind = params.pop("type")
+        else:
+            raise TypeError("unsupported column spec: %s=%r" % (name, spec))
+        if kind not in COLUMN_TYPES:
+            raise ValueError("unknown column type: %s (supported: %s)" % (kind, ", ".join(COLUMN_TYPES)))
+        fields.append((name, kind, params))
+    return fields
+
+
+def iter_batches(schema, count, seed=None, shard=0, offset=None, batch_size=DEFAULT_BATCH_SIZE, use_numpy=False):
+    """
+    按批生成, 每批为{列名: [值, ...]}
+    Args:
+        schema: {列名: 类型名 或 {"type": 类型名, 参数...}}, 类型见COLUMN_TYPES
+        count: 行数
+        seed: 种子, 相同的(seed, shard, count, batch_size, use_numpy)生成的数据完全一致; None时随机
+        shard: 分片序号, 不同分片使用不同的种子, 数据互不相关
+        offset: 本分片第一行在整个数据集中的序号, 用于sequence列续接, 默认为shard*count
+        batch_size: 每批行数
+        use_numpy: 是否使用numpy生成数值/字符串列(结果与random实现不同)
+
+    Returns:
+        生成器
+    """
+    if seed is None:
+        seed = random.randrange(1 << 63)
+    if use_numpy and numpy is None:
+        raise ImportError("use_numpy=True requires numpy")
+    columns = []
+    for name, kind, params in _parse_schema(schema):
+        state = field_seed(seed, shard, name)
+        if use_numpy and kind in _NUMPY_COLUMN_TYPES:
+            columns.append((name, _NUMPY_COLUMN_TYPES[kind], numpy.random.default_rng(state), params))
+        else:
+            columns.append((name, COLUMN_TYPES[kind], random.Random(state), params))
+    if offset is None:
+        offset = shard * count
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        yield {name: func(rnd, size, offset + start, **params) for name, func, rnd, params in columns}
+
+
+def generate(schema, count, seed=None, shard=0, offset=None, batch_size=DEFAULT_BATCH_SIZE, use_numpy=False):
+    """
+    按列生成
+    Returns:
+        dict: {列名: [值, ...]}
+    Examples:
+        >>> generate({"id": "sequence", "age": {"type": "int_number", "min_value": 18, "max_value": 60},
+        ...           "mail": "mail", "name": {"type": "faker", "method": "name"}}, 1000, seed=1)
+    """
+    columns = {name: [] for name in schema}
+    for batch in iter_batches(schema, count, seed, shard, offset, batch_size, use_numpy):
+        for name, values in batch.items():
+            columns[name].extend(values)
+    return columns
+
+
+def iter_rows(schema, count, seed=None, shard=0, offset=None, batch_size=DEFAULT_BATCH_SIZE, use_numpy=False):
+    """按行生成dict, 参数同iter_batches"""
+    names = list(schema)
+    for batch in iter_batches(schema, count, seed, shard, offset, batch_size, use_numpy):
+        for values in zip(*(batch[name] for name in names)):
+            yield dict(zip(names, values))
+
+
+def write_ndjson(fp, schema, count, seed=None, shard=0, offset=None, batch_size=DEFAULT_BATCH_SIZE, use_numpy=False):
+    """
+    流式写入NDJSON, 每批拼接后写入一次
+    Args:
+        fp: 文本文件对象
+    """
+    names = list(schema)
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    for batch in iter_batches(schema, count, seed, shard, offset, batch_size, use_numpy):
+        lines = [dumps(dict(zip(names, values))) for values in zip(*(batch[name] for name in names))]
+        lines.append("")
+        fp.write("\n".join(lines))
+
+
+def write_csv(fp, schema, count, seed=None, shard=0, offset=None, batch_size=DEFAULT_BATCH_SIZE, use_numpy=False,
+              header=True):
+    """
+    流式写入CSV
+    Args:
+        fp: 以newline=""打开的文本文件对象
+        header: 是否写入表头
+    """
+    names = list(schema)
+    writer = csv.writer(fp)
+    if header:
+        writer.writerow(names)
+    for batch in iter_batches(schema, count, seed, shard, offset, batch_size, use_numpy):
+        writer.writerows(zip(*(batch[name] for name in names)))
+
+
+def dump(target, schema, count, fmt="ndjson", encoding="utf-8", **options):
+    """
+    写入文件
+    Args:
+        target: 文件路径或文本文件对象
+        schema: 同iter_batches
+        count: 行数
+        fmt: ndjson/csv
+        encoding: target为路径时的文件编码
+        options: iter_batches的seed/shard/offset/batch_size/use_numpy, 以及write_csv的header
+
+    Returns:
+
+    Examples:
+        >>> dump("users.ndjson", {"id": "sequence", "mobile": "mobile_number"}, 100000, seed=2026)
+    """
+    if fmt not in ("ndjson", "csv"):
+        raise ValueError("unsupported format: %s" % fmt)
+    if isinstance(target, (str, bytes, os.PathLike)):
+        with open(target, "w", encoding=encoding, newline="") as f:
+            return dump(f, schema, count, fmt, encoding=encoding, **options)
+    if fmt == "csv":
+        write_csv(target, schema, count, **options)
+    else:
+        write_ndjson(target, schema, count, **options)
+
+
+def split_shards(count, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    按shard_size切分行数
+    Returns:
+        list: [(分片序号, 行数, 第一行的序号)]
+    """
+    if shard_size <= 0:
+        raise ValueError("shard_size must be positive")
+    return [(shard, min(shard_size, count - offset), offset)
+            for shard, offset in enumerate(range(0, count, shard_size))]
+
+
+def _write_shard(path, schema, count, fmt, seed, shard, offset, options):
+    dump(path, schema, count, fmt, seed=seed, shard=shard, offset=offset, **options)
+    return path
+
+
+def write_shards(directory, schema, count, seed, fmt="ndjson", shard_size=DEFAULT_SHARD_SIZE, processes=None,
+                 prefix="part", encoding="utf-8", **options):
+    """
+    把数据集切分为多个分片, 在进程池中并行生成, 每个分片写入单独的文件;
+    分片的数据只由(seed, 分片序号, shard_size)决定, 与进程数及执行顺序无关, 相同参数重跑时文件逐字节一致
+    Args:
+        directory: 输出目录, 不存在时自动创建
+        schema: 同iter_batches
+        count: 总行数
+        seed: 种子, 不能为None
+        fmt: ndjson/csv
+        shard_size: 每个分片的行数
+        processes: 进程数, None时为cpu核数, 1时在当前进程中依次生成
+        prefix: 文件名前缀, 文件名为{prefix}-{分片序号:05d}.{fmt}
+        encoding: 文件编码
+        options: batch_size/use_numpy, 以及csv的header
+
+    Returns:
+        list: 按分片序号排列的文件路径
+
+    Examples:
+        >>> write_shards("fixtures", {"id": "sequence", "mail": "mail"}, 100000000, seed=2026, shard_size=1000000)
+    """
+    if seed is None:
+        raise ValueError("seed is required for reproducible shards")
+    if fmt not in ("ndjson", "csv"):
+        raise ValueError("unsupported format: %s" % fmt)
+    _parse_schema(schema)
+    os.makedirs(directory, exist_ok=True)
+    options = dict(options, encoding=encoding)
+    tasks = [(os.path.join(directory, "%s-%05d.%s" % (prefix, shard, fmt)), shard, size, offset)
+             for shard, size, offset in split_shards(count, shard_size)]
+    if processes == 1 or len(tasks) <= 1:
+        return [_write_shard(path, schema, size, fmt, seed, shard, offset, options)
+                for path, shard, size, offset in tasks]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(_write_shard, path, schema, size, fmt, seed, shard, offset, options)
+                   for path, shard, size, offset in tasks]
+        return [future.result() for future in futures]
+
+
+def _load_schema(value):
+    """命令行的schema参数: json文件路径或json字符串"""
+    if os.path.isfile(value):
+        with open(value, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(value)
+
+
+def main(argv=None):
+    """
+    命令行入口
+    Examples:
+        python -m hutools.core.mockdata --schema schema.json --rows 100000000 --seed 2026 --out fixtures
+        python -m hutools.core.mockdata --schema '{"id": "sequence", "mail": "mail"}' --rows 10 --seed 1
+    """
+    parser = argparse.ArgumentParser(prog="python -m hutools.core.mockdata", description="生成mock数据集")
+    parser.add_argument("--schema", required=True, help="json文件路径或json字符串, {列名: 类型名 或 {\"type\": 类型名, 参数...}}")
+    parser.add_argument("--rows", type=int, required=True, help="总行数")
+    parser.add_argument("--seed", type=int, required=True, help="种子, 相同参数重跑时输出逐字节一致")
+    parser.add_argument("--out", help="输出目录, 不指定时写到标准输出")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="每个分片(文件)的行数")
+    parser.add_argument("--processes", type=int, default=None, help="进程数, 默认为cpu核数")
+    parser.add_argument("--prefix", default="part", help="分片文件名前缀")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--numpy", action="store_true", help="使用numpy生成数值/字符串列")
+    parser.add_argument("--no-header", action="store_true", help="csv不写表头")
+    args = parser.parse_args(argv)
+
+    schema = _load_schema(args.schema)
+    options = {"batch_size": args.batch_size, "use_numpy": args.numpy}
+    if args.format == "csv":
+        options["header"] = not args.no_header
+    if args.out is None:
+        for shard, size, offset in split_shards(args.rows, args.shard_size):
+            if shard and args.format == "csv":
+                options["header"] = False
+            dump(sys.stdout, schema, size, args.format, seed=args.seed, shard=shard, offset=offset, **options)
+        return
+    for path in write_shards(args.out, schema, args.rows, args.seed, args.format, args.shard_size, args.processes,
+                             args.prefix, **options):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,26 +9,202 @@
 @License :  (C)Copyright 2022-2026
 @Desc    :  An XPath for JSON 后置处理
 """
+import ast
 import base64
+import copy
 import hashlib
 import json
+import operator
 import re
 import sys
 import xml.dom.minidom
 import xml.etree.ElementTree
-from functools import reduce
-from itertools import zip_longest
+from bisect import bisect_left
+from collections import ChainMap, deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, reduce
+from itertools import chain, islice, repeat, zip_longest
 from typing import Text, Dict, Any
 from urllib.parse import unquote
+from xml.sax.saxutils import escape
 
-from dicttoxml import dicttoxml
 from lxml import etree
 from six import text_type, binary_type
 
+from hutools.core.dict2xml import dump_xml, dumps_xml
 from hutools.core.xml2dict import Xml2Dict
 
 SINGLE_UPLOAD_LENGTH = 5 * 1024 * 1024 * 1024  # 单次上传文件最大为5GB
 DEFAULT_CHUNK_SIZE = 1024 * 1024  # 计算MD5值时,文件单次读取的块大小为1MB
+_MINIDOM_ENTITIES = {'"': '&quot;'}  # minidom文本节点额外转义双引号
+
+
+def _freeze(value):
+    """
+    将dict/list/set等不可哈希的对象递归转换为稳定的可哈希表示, 相等的对象转换结果相等
+    Args:
+        value:
+
+    Returns:
+
+    """
+    if isinstance(value, dict):
+        return _FROZEN_DICT, frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return _FROZEN_LIST, tuple(_freeze(v) for v in value)
+    if isinstance(value, tuple):
+        return _FROZEN_TUPLE, tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    hash(value)
+    return value
+
+
+class _FrozenTag:
+    """_freeze使用的类型标记, 避免与普通元组的值相等"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "<frozen %s>" % self.name
+
+
+_FROZEN_DICT = _FrozenTag("dict")
+_FROZEN_LIST = _FrozenTag("list")
+_FROZEN_TUPLE = _FrozenTag("tuple")
+_EMPTY = object()
+
+
+def _shallow_copy(value):
+    """浅复制字典, 保留dict子类的类型"""
+    return dict(value) if type(value) is dict else copy.copy(value)
+
+
+class DictOverlay(Mapping):
+    """
+    多层字典的惰性合并视图, 靠后的层优先; 同一个key在多层中都是dict时, 返回下一级的DictOverlay
+    Examples:
+        >>> overlay = DictOverlay({"a": 1, "c": {"x": 1}}, {"b": 2, "c": {"y": 2}})
+        >>> overlay["c"]["x"], overlay["c"]["y"], overlay.to_dict()
+    """
+
+    def __init__(self, *layers):
+        self._layers = layers
+
+    def __getitem__(self, key):
+        found = []
+        for layer in reversed(self._layers):
+            if key not in layer:
+                continue
+            value = layer[key]
+            if not isinstance(value, dict):
+                if found:
+                    break
+                return value
+            found.append(value)
+        if not found:
+            raise KeyError(key)
+        if len(found) == 1:
+            return found[0]
+        found.reverse()
+        return DictOverlay(*found)
+
+    def __contains__(self, key):
+        return any(key in layer for layer in self._layers)
+
+    def __iter__(self):
+        seen = set()
+        for layer in self._layers:
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return "DictOverlay(%s)" % ", ".join(repr(layer) for layer in self._layers)
+
+    def to_dict(self):
+        """物化为普通的dict"""
+        return {key: value.to_dict() if isinstance(value, DictOverlay) else value for key, value in self.items()}
+
+
+class CaseInsensitiveMapping(Mapping):
+    """
+    大小写不敏感的只读视图, 不复制数据; 迭代时直接遍历原字典, 查找时使用key索引, 索引在未命中或失效时重建
+    Examples:
+        >>> headers = CaseInsensitiveMapping({"Content-Type": "text/html", "X-Id": 1})
+        >>> headers["content-type"], "X-ID" in headers, list(headers)
+    """
+
+    def __init__(self, data, case="lower", nested=False):
+        """初始化
+        :param data(dict): 原始字典
+        :param case(str): key的形式, lower/upper
+        :param nested(bool): 值为dict时是否同样返回大小写不敏感的视图
+        """
+        self._data = data
+        self._upper = case == "upper"
+        self._nested = nested
+        self._index = None
+        self._index_len = -1
+
+    def _fold(self, key):
+        if not isinstance(key, str):
+            return key
+        return key.upper() if self._upper else key.lower()
+
+    def _build_index(self):
+        fold = self._fold
+        self._index = {fold(key): key for key in self._data}
+        self._index_len = len(self._data)
+        return self._index
+
+    def original_key(self, key):
+        """获取原字典中对应的key, 不存在时抛出KeyError"""
+        folded = self._fold(key)
+        original = _EMPTY
+        if self._index is not None and self._index_len == len(self._data):
+            original = self._index.get(folded, _EMPTY)
+        if original is _EMPTY or original not in self._data:
+            original = self._build_index().get(folded, _EMPTY)
+            if original is _EMPTY:
+                raise KeyError(key)
+        return original
+
+    def __getitem__(self, key):
+        value = self._data[self.original_key(key)]
+        if self._nested and isinstance(value, dict):
+            return CaseInsensitiveMapping(value, "upper" if self._upper else "lower", nested=True)
+        return value
+
+    def __contains__(self, key):
+        try:
+            self.original_key(key)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        # 大小写重复的key只产出一次, 顺序为首次出现的位置, 与lower_dict_keys一致
+        fold = self._fold
+        seen = set()
+        for key in list(self._data):
+            folded = fold(key)
+            if folded not in seen:
+                seen.add(folded)
+                yield folded
+
+    def __len__(self):
+        fold = self._fold
+        return len({fold(key) for key in self._data})
+
+    def __repr__(self):
+        return "CaseInsensitiveMapping(%r)" % (self._data,)
 
 
 class AttrDict(dict):
@@ -81,12 +257,14 @@ class DataHand:
         return variable
 
     @staticmethod
-    def deep_dict_update(main_dict: Dict[Any, Any], update_dict: Dict[Any, Any]) -> dict[Any, Any]:
+    def deep_dict_update(main_dict: Dict[Any, Any], update_dict: Dict[Any, Any], persistent=False) -> Dict[Any, Any]:
         """
-        字典更新
+        字典深度更新, 使用显式栈迭代合并, 不受递归深度限制
         Args:
-            main_dict:
-            update_dict:
+            main_dict: 被更新的字典
+            update_dict: 更新内容
+            persistent: False时原地更新main_dict; True时不修改main_dict, 返回合并后的新字典,
+                只复制被修改路径上的字典, 未变化的子树与main_dict共享
 
         Returns:
 
@@ -94,25 +272,49 @@ class DataHand:
             >>> main_dict = {"a":1, "b":2, "c":{"abc":123}}
             >>> update_dict = {"a":2, "b":5, "c":{"abc":1235678}}
             >>> print(DataHand.deep_dict_update(main_dict, update_dict))
+            >>> print(DataHand.deep_dict_update(main_dict, {"c": {"d": 1}}, persistent=True))
 
         """
-        for key, value in update_dict.items():
-            if (
-                    key in main_dict
-                    and isinstance(main_dict[key], dict)
-                    and isinstance(value, dict)
-            ):
-                DataHand.deep_dict_update(main_dict[key], value)
+        if persistent:
+            main_dict = _shallow_copy(main_dict)
+        stack = [(main_dict, iter(update_dict.items()))]
+        while stack:
+            target, items = stack[-1]
+            for key, value in items:
+                if key in target and isinstance(target[key], dict) and isinstance(value, dict):
+                    child = target[key]
+                    if persistent:
+                        child = target[key] = _shallow_copy(child)
+                    stack.append((child, iter(value.items())))
+                    break
+                target[key] = value
             else:
-                main_dict[key] = value
+                stack.pop()
         return main_dict
 
     @staticmethod
-    def lower_dict_keys(origin_dict: Dict):
+    def dict_overlay(*layers):
+        """
+        多个字典的惰性深度合并视图, 不复制任何数据, 适用于读多写少的配置覆盖
+        Args:
+            layers: 由低到高的字典层, 靠后的层优先, 合并规则与deep_dict_update一致
+
+        Returns:
+            DictOverlay
+
+        Examples:
+            >>> config = DataHand.dict_overlay({"db": {"host": "a", "port": 1}}, {"db": {"host": "b"}})
+            >>> config["db"]["port"], config["db"]["host"]
+        """
+        return DictOverlay(*layers)
+
+    @staticmethod
+    def lower_dict_keys(origin_dict: Dict, view=False):
         """
         convert keys in dict to lower case
         Args:
             origin_dict: mapping data structure
+            view: return a CaseInsensitiveMapping view instead of copying the dict
 
         Returns:
             dict: mapping with all keys lowered.
@@ -120,29 +322,36 @@ class DataHand:
         Examples:
             >>> origin_dict = { "Name": "", "Request": "", "URL": "", "METHOD": "", "Headers": "", "Data": ""}
             >>> DataHand.lower_dict_keys(origin_dict)
+            >>> DataHand.lower_dict_keys(origin_dict, view=True)["url"]
         """
         if not origin_dict or not isinstance(origin_dict, dict):
             return origin_dict
 
+        if view:
+            return CaseInsensitiveMapping(origin_dict, case="lower")
         return {key.lower(): value for key, value in origin_dict.items()}
 
     @staticmethod
-    def upper_dict_keys(origin_dict: Dict):
+    def upper_dict_keys(origin_dict: Dict, view=False):
         """
-        convert keys in dict to lower case
+        convert keys in dict to upper case
         Args:
             origin_dict: mapping data structure
+            view: return a CaseInsensitiveMapping view instead of copying the dict
 
         Returns:
-            dict: mapping with all keys lowered.
+            dict: mapping with all keys uppered.
 
         Examples:
             >>> origin_dict = {'name': '', 'request': '', 'url': '', 'method': '', 'headers': '', 'data': ''}
             >>> DataHand.upper_dict_keys(origin_dict)
+            >>> DataHand.upper_dict_keys(origin_dict, view=True)["URL"]
         """
         if not origin_dict or not isinstance(origin_dict, dict):
             return origin_dict
 
+        if view:
+            return CaseInsensitiveMapping(origin_dict, case="upper")
         return {key.upper(): value for key, value in origin_dict.items()}
 
     @staticmethod
@@ -248,32 +457,23 @@ class DataHand:
         Returns:
 
         """
-        doc = xml.dom.minidom.Document()
-        root = doc.createElement('CompleteMultipartUpload')
-        doc.appendChild(root)
-
         if 'Part' not in data:
             raise Exception("Invalid Parameter, Part Is Required!")
 
+        # 直接拼接字符串, 转义规则与minidom.toxml一致(&<>"), 不再构建DOM树
+        parts = []
         for i in data['Part']:
-            node_part = doc.createElement('Part')
-
             if 'PartNumber' not in i:
                 raise Exception("Invalid Parameter, PartNumber Is Required!")
-
-            node_number = doc.createElement('PartNumber')
-            node_number.appendChild(doc.createTextNode(str(i['PartNumber'])))
-
             if 'ETag' not in i:
                 raise Exception("Invalid Parameter, ETag Is Required!")
-
-            node_etag = doc.createElement('ETag')
-            node_etag.appendChild(doc.createTextNode(str(i['ETag'])))
-
-            node_part.appendChild(node_number)
-            node_part.appendChild(node_etag)
-            root.appendChild(node_part)
-        return doc.toxml('utf-8')
+            parts.append('<Part><PartNumber>%s</PartNumber><ETag>%s</ETag></Part>' % (
+                escape(str(i['PartNumber']), _MINIDOM_ENTITIES), escape(str(i['ETag']), _MINIDOM_ENTITIES)))
+        if not parts:
+            # 与minidom一致, 没有子节点时输出自闭合标签
+            return b'<?xml version="1.0" encoding="utf-8"?><CompleteMultipartUpload/>'
+        return ('<?xml version="1.0" encoding="utf-8"?><CompleteMultipartUpload>%s</CompleteMultipartUpload>'
+                % ''.join(parts)).encode('utf-8')
 
     @staticmethod
     def xml_to_dict(data, origin_str="", replace_str=""):
@@ -295,6 +495,22 @@ class DataHand:
         xmldict = eval(xmlstr)
         return xmldict
 
+    @staticmethod
+    def iter_xml(source, path):
+        """
+        流式解析大型xml, 逐条产出匹配节点对应的dict, 结构与xml_to_dict一致
+        Args:
+            source: 文件路径、文件对象或xml字符串/bytes
+            path: 节点tag或路径, 如data、result/data
+
+        Returns:
+
+        Examples:
+            >>> for record in DataHand.iter_xml("export.xml", "result/data"):
+            ...     print(record)
+        """
+        return Xml2Dict.iterparse(source, path)
+
     @staticmethod
     def get_id_from_xml(data, name):
         """
@@ -326,13 +542,34 @@ class DataHand:
 
         """
         if parent_child:
-            xml_config = dicttoxml(data, item_func=lambda x: x[:-1], custom_root=root, attr_type=False)
+            xml_config = dumps_xml(data, item_func=lambda x: x[:-1], custom_root=root, attr_type=False)
         else:
-            xml_config = dicttoxml(data, item_func=lambda x: x, custom_root=root, attr_type=False)
+            xml_config = dumps_xml(data, item_func=lambda x: x, custom_root=root, attr_type=False)
         for i in lst:
             xml_config = xml_config.replace(DataHand.to_bytes(i + i), DataHand.to_bytes(i))
         return xml_config
 
+    @staticmethod
+    def dump_xml(data, fp, root="root", parent_child=False, **options):
+        """
+        将dict流式写入xml文件, 标签规则与format_xml一致, 适用于大数据量
+        Args:
+            data:
+            fp: 文件对象, 文本模式写入str, 二进制模式写入bytes
+            root: 根节点名称
+            parent_child: 列表元素的标签名是否为父节点名称去掉最后一个字符(如Parts->Part)
+            **options: 透传给XmlWriter的其它参数
+
+        Returns:
+
+        Examples:
+            >>> with open("data.xml", "wb") as f:
+            ...     DataHand.dump_xml({"Parts": [{"PartNumber": 1}]}, f, root="Data", parent_child=True)
+        """
+        item_func = (lambda x: x[:-1]) if parent_child else (lambda x: x)
+        options.setdefault("attr_type", False)
+        dump_xml(data, fp, item_func=item_func, custom_root=root, **options)
+
     @staticmethod
     def format_values(data):
         """
@@ -372,10 +609,10 @@ class DataHand:
         """
         保序去重
         Args:
-            iterable: 去重的同时要对element做的操作
-            keep: 使用哪一部分去重
-            key: 是否反向去重
-            reverse:
+            iterable: 需要去重的序列
+            keep: 去重的同时要对element做的操作
+            key: 使用哪一部分去重
+            reverse: 是否反向去重(保留最后一次出现的元素)
         Returns:
         Examples:
             >>> repetition_list = [3, 4, 5, 2, 4, 1]
@@ -389,39 +626,77 @@ class DataHand:
             # 去重后仅保留部分数据
             >>> DataHand.duplicate(repetition_list, key=lambda x: x["a"], keep=lambda x: x["b"])
         """
-        result = list()
-        duplicator = list()
         if reverse:
-            iterable = reversed(iterable)
+            result = list(DataHand.iter_unique(reversed(iterable), keep=keep, key=key))
+            result.reverse()
+            return result
+        return list(DataHand.iter_unique(iterable, keep=keep, key=key))
+
+    @staticmethod
+    def iter_unique(iterable, keep=lambda x: x, key=lambda x: x):
+        """
+        保序去重的生成器版本, 惰性产出元素, 适用于流水线中的大数据量去重
+        可哈希的key通过set判重; dict/list等不可哈希的key先转为稳定的可哈希表示; 仍无法处理的对象退化为逐个比较
+        Args:
+            iterable: 需要去重的可迭代对象
+            keep: 去重的同时要对element做的操作
+            key: 使用哪一部分去重
+        Returns:
+        Examples:
+            >>> for item in DataHand.iter_unique([{"a": 1}, {"a": 1}, {"a": 2}]):
+            ...     print(item)
+        """
+        seen = set()
+        unhashable = list()
         for i in iterable:
-            keep_field = keep(i)
             key_words = key(i)
-            if key_words not in duplicator:
-                result.append(keep_field)
-                duplicator.append(key_words)
-        return list(reversed(result)) if reverse else result
+            try:
+                if key_words in seen:
+                    continue
+                seen.add(key_words)
+            except TypeError:
+                try:
+                    frozen = _freeze(key_words)
+                except TypeError:
+                    if key_words in unhashable:
+                        continue
+                    unhashable.append(key_words)
+                else:
+                    if frozen in seen:
+                        continue
+                    seen.add(frozen)
+            yield keep(i)
 
     @staticmethod
-    def chain_all(iter):
+    def chain_all(iter, lazy=False):
         """
-        连接多个序列或字典
+        连接多个序列或字典, 线性时间, 不产生中间结果
         Args:
-            iter:
+            iter: 由序列或字典组成的可迭代对象
+            lazy: 是否惰性连接, 序列返回itertools.chain迭代器, 字典返回ChainMap视图(靠后的字典优先)
         Returns:
         Examples:
             >>> DataHand.chain_all([[1, 2], [1, 2]])
             >>> DataHand.chain_all([{"a": 1}, {"b": 2}])
+            >>> for item in DataHand.chain_all(([i, i + 1] for i in range(3)), lazy=True):
+            ...     print(item)
         """
-        iter = list(iter)
-        if not iter:
-            return []
-        if isinstance(iter[0], dict):
-            result = {}
-            for i in iter:
+        iterator = (i for i in iter)
+        first = next(iterator, _EMPTY)
+        if first is _EMPTY:
+            return chain() if lazy else []
+        if isinstance(first, dict):
+            if lazy:
+                maps = [first]
+                maps.extend(iterator)
+                maps.reverse()
+                return ChainMap(*maps)
+            result = dict(first)
+            for i in iterator:
                 result.update(i)
-        else:
-            result = reduce(lambda x, y: list(x) + list(y), iter)
-        return result
+            return result
+        result = chain.from_iterable(chain((first,), iterator))
+        return result if lazy else list(result)
 
     @staticmethod
     def safely_json_loads(json_str, default_type=dict, escape=True):
@@ -603,17 +878,93 @@ class DataHand:
             return raw_data
 
 
+@lru_cache(maxsize=512)
+def _compile_xpath(xpath):
+    return etree.XPath(xpath)
+
+
+def _xpath_result_to_python(value):
+    """xpath结果转换为可跨进程传输的普通对象: 节点转为html字符串, 文本转为str"""
+    if isinstance(value, list):
+        return [_xpath_result_to_python(item) for item in value]
+    if isinstance(value, etree._Element):
+        return etree.tostring(value, encoding="unicode")
+    if isinstance(value, str):
+        return str(value)
+    return value
+
+
+def _html_find_worker(res, xpath, index):
+    result = HtmlHand.compile(xpath)(HtmlHand.parse(res))
+    if index is not None:
+        result = result[index]
+    return _xpath_result_to_python(result)
+
+
 class HtmlHand:
+    @staticmethod
+    def compile(xpath):
+        """
+        编译xpath表达式, 按表达式缓存, 重复查询时不再解析
+        :param xpath:
+        :return: etree.XPath
+        """
+        return _compile_xpath(xpath)
+
+    @staticmethod
+    def parse(res):
+        """
+        解析html, 已经解析过的节点原样返回, 便于同一个文档执行多个查询
+        :param res: html字符串/bytes或etree节点
+        :return:
+        """
+        if isinstance(res, etree._Element):
+            return res
+        return etree.HTML(res)
+
     @staticmethod
     def find(res, xpath, index) -> Text:
         """
         获取html中的数据
-        :param res:
+        :param res: html字符串/bytes, 也可以是HtmlHand.parse的结果
         :param xpath:
         :param index:
         :return:
         """
-        return etree.HTML(res).xpath(xpath)[index]
+        return HtmlHand.compile(xpath)(HtmlHand.parse(res))[index]
+
+    @staticmethod
+    def find_many(res, xpaths):
+        """
+        只解析一次html, 执行多个xpath
+        :param res: html字符串/bytes或etree节点
+        :param xpaths: {名称: xpath}或xpath列表
+        :return: 与xpaths结构一致的完整结果
+        Examples:
+            >>> HtmlHand.find_many(html, {"title": "//title/text()", "links": "//a/@href"})
+        """
+        doc = HtmlHand.parse(res)
+        if isinstance(xpaths, dict):
+            return {name: HtmlHand.compile(xpath)(doc) for name, xpath in xpaths.items()}
+        return [HtmlHand.compile(xpath)(doc) for xpath in xpaths]
+
+    @staticmethod
+    def batch_find(docs, xpath, index=None, processes=None, chunksize=16):
+        """
+        用进程池对大量html执行同一个xpath, 节点结果转换为html字符串, 文本结果转换为str
+        :param docs: html字符串/bytes的列表
+        :param xpath:
+        :param index: 取第几个结果, None时返回完整的结果列表
+        :param processes: 进程数, 默认为cpu核数, 1时在当前进程中执行
+        :param chunksize: 每次分发给子进程的文档数
+        :return: 与docs顺序一致的结果列表
+        """
+        if processes == 1:
+            return [_html_find_worker(res, xpath, index) for res in docs]
+        docs = list(docs)
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            return list(executor.map(_html_find_worker, docs, repeat(xpath, len(docs)), repeat(index, len(docs)),
+                                     chunksize=chunksize))
 
     @staticmethod
     def border(sum_str, left_str, right_str, offset=0):
@@ -638,6 +989,807 @@ class HtmlHand:
                 return None
 
 
+_SLICE_PATTERN = re.compile(r"(-?[0-9]*):(-?[0-9]*):?(-?[0-9]*)$")
+_PIECE_PATTERN = re.compile(r"'?,'?")
+# 在遍历中遇到这些key时需要按表达式重新解析, 不能直接当作普通key
+_SPECIAL_LOCS = ("*", "..", "!")
+_DYNAMIC_CACHE_SIZE = 1024
+_FILTER_BUILTINS = {
+    "len": len, "str": str, "int": int, "float": float, "bool": bool, "abs": abs, "min": min, "max": max,
+    "round": round, "sum": sum, "any": any, "all": all, "sorted": sorted, "list": list, "tuple": tuple,
+    "set": set, "dict": dict, "isinstance": isinstance,
+}
+_FILTER_METHODS = frozenset((
+    "startswith", "endswith", "lower", "upper", "strip", "lstrip", "rstrip", "split", "replace", "find", "count",
+    "index", "isdigit", "isalpha", "isalnum", "get", "keys", "values", "items",
+))
+_FILTER_BIN_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow,
+}
+_FILTER_UNARY_OPS = {ast.Not: operator.not_, ast.USub: operator.neg, ast.UAdd: operator.pos, ast.Invert: operator.invert}
+_FILTER_COMPARE_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt,
+    ast.GtE: operator.ge, ast.Is: operator.is_, ast.IsNot: operator.is_not,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+}
+
+
+def _filter_source(loc):
+    """
+    将JsonHand的过滤/索引表达式改写为python表达式, @为当前节点(__obj)
+    @.length -> len(__obj), &&/|| -> and/or, !@.name -> 'name' not in __obj, @.a.b -> __obj['a']['b']
+    """
+    loc = loc.replace("@.length", "len(__obj)")
+    loc = loc.replace("&&", " and ").replace("||", " or ")
+
+    def notvar(m):
+        return "'%s' not in __obj" % m.group(1)
+
+    loc = re.sub(r"!@\.([a-zA-Z@_0-9-]*)", notvar, loc)
+
+    def varmatch(m):
+        def brackets(elts):
+            ret = "__obj"
+            for e in elts:
+                if e.isdigit():
+                    ret += "[%s]" % e
+                else:
+                    ret += "['%s']" % e
+            return ret
+
+        elts = m.group(1).split(".")
+        if elts[-1] == "length":
+            return "len(%s)" % brackets(elts[1:-1])
+        return brackets(elts[1:])
+
+    loc = re.sub(r"(?<!\\)(@\.[a-zA-Z@_.0-9]+)", varmatch, loc)
+    return re.sub(r"(?<!\\)@", "__obj", loc).replace(r"\@", "@")
+
+
+class _FilterCompileError(Exception):
+    """表达式中含有不支持的语法或未知的名称, 需要退回eval"""
+
+
+def _compile_filter_node(node):
+    """把python表达式的语法树编译为闭包, 参数为当前节点, 只支持白名单内的语法"""
+    node_type = type(node)
+    if node_type is ast.Expression:
+        return _compile_filter_node(node.body)
+    if node_type is ast.Constant:
+        value = node.value
+        return lambda obj: value
+    if node_type is ast.Name:
+        if node.id == "__obj":
+            return lambda obj: obj
+        if node.id in _FILTER_BUILTINS:
+            value = _FILTER_BUILTINS[node.id]
+            return lambda obj: value
+        raise _FilterCompileError(node.id)
+    if node_type is ast.Subscript:
+        target = _compile_filter_node(node.value)
+        index = _compile_filter_node(node.slice)
+        return lambda obj: target(obj)[index(obj)]
+    if node_type is ast.Slice:
+        parts = [_compile_filter_node(part) if part is not None else (lambda obj: None)
+                 for part in (node.lower, node.upper, node.step)]
+        return lambda obj: slice(parts[0](obj), parts[1](obj), parts[2](obj))
+    if node_type is ast.Attribute:
+        if node.attr not in _FILTER_METHODS:
+            raise _FilterCompileError(node.attr)
+        target = _compile_filter_node(node.value)
+        name = node.attr
+        return lambda obj: getattr(target(obj), name)
+    if node_type is ast.Call:
+        if node.keywords or any(type(arg) is ast.Starred for arg in node.args):
+            raise _FilterCompileError("call")
+        func = _compile_filter_node(node.func)
+        args = [_compile_filter_node(arg) for arg in node.args]
+        return lambda obj: func(obj)(*[arg(obj) for arg in args])
+    if node_type is ast.BoolOp:
+        values = [_compile_filter_node(value) for value in node.values]
+        if type(node.op) is ast.And:
+            def and_(obj):
+                result = True
+                for value in values:
+                    result = value(obj)
+                    if not result:
+                        return result
+                return result
+
+            return and_
+
+        def or_(obj):
+            result = False
+            for value in values:
+                result = value(obj)
+                if result:
+                    return result
+            return result
+
+        return or_
+    if node_type is ast.UnaryOp and type(node.op) in _FILTER_UNARY_OPS:
+        op = _FILTER_UNARY_OPS[type(node.op)]
+        operand = _compile_filter_node(node.operand)
+        return lambda obj: op(operand(obj))
+    if node_type is ast.BinOp and type(node.op) in _FILTER_BIN_OPS:
+        op = _FILTER_BIN_OPS[type(node.op)]
+        left, right = _compile_filter_node(node.left), _compile_filter_node(node.right)
+        return lambda obj: op(left(obj), right(obj))
+    if node_type is ast.Compare:
+        left = _compile_filter_node(node.left)
+        pairs = [(_FILTER_COMPARE_OPS[type(op)], _compile_filter_node(comparator))
+                 for op, comparator in zip(node.ops, node.comparators)]
+
+        def compare(obj):
+            current = left(obj)
+            for op, comparator in pairs:
+                value = comparator(obj)
+                if not op(current, value):
+                    return False
+                current = value
+            return True
+
+        return compare
+    if node_type is ast.IfExp:
+        test, body, orelse = (_compile_filter_node(item) for item in (node.test, node.body, node.orelse))
+        return lambda obj: body(obj) if test(obj) else orelse(obj)
+    if node_type in (ast.List, ast.Tuple, ast.Set):
+        items = [_compile_filter_node(item) for item in node.elts]
+        factory = {ast.List: list, ast.Tuple: tuple, ast.Set: set}[node_type]
+        return lambda obj: factory(item(obj) for item in items)
+    raise _FilterCompileError(node_type.__name__)
+
+
+def _compile_filter(loc, debug=0):
+    """
+    编译过滤/索引表达式, 返回func(obj, context), 运行时异常视为False;
+    含有未知名称(如调用方模块中的函数)时退回eval, 此时使用调用方的globals; debug时打印每次求值的结果
+    """
+    evaluate = _compile_filter_func(loc)
+    if not debug:
+        return evaluate
+
+    def traced_evaluate(obj, context):
+        print("evalx", loc)
+        value = evaluate(obj, context)
+        print("->", value)
+        return value
+
+    return traced_evaluate
+
+
+def _compile_filter_source(source):
+    """把改写后的python表达式编译为闭包, 含有白名单以外的语法或名称时返回None"""
+    try:
+        return _compile_filter_node(ast.parse(source.strip(), mode="eval"))
+    except (SyntaxError, _FilterCompileError, KeyError):
+        return None
+
+
+def _loc_needs_eval(loc):
+    """loc中的(expr)/?(expr)是否需要退回eval, 判断顺序与_compile_loc一致"""
+    if loc.startswith("(") and loc.endswith(")"):
+        return _compile_filter_source(_filter_source(loc)) is None
+    if loc.startswith("?(") and loc.endswith(")"):
+        return _compile_filter_source(_filter_source(loc[2:-1])) is None
+    if loc in _SPECIAL_LOCS or _SLICE_PATTERN.match(loc) or loc.find(",") < 0:
+        return False
+    return any(_loc_needs_eval(piece) for piece in _PIECE_PATTERN.split(loc))
+
+
+def _compile_filter_func(loc):
+    """优先把表达式编译为闭包, 编译不了时退回eval"""
+    source = _filter_source(loc)
+    func = _compile_filter_source(source)
+    if func is not None:
+        def evaluate(obj, context):
+            try:
+                return func(obj)
+            except Exception:
+                return False
+
+        return evaluate
+
+    def evaluate_with_eval(obj, context):
+        if not context.use_eval:
+            raise Exception("eval disabled")
+        try:
+            return eval(source, context.caller_globals, {"__obj": obj})
+        except Exception:
+            return False
+
+    return evaluate_with_eval
+
+
+def _as_path(path):
+    """内部路径转换为$['a'][0]格式"""
+    p = "$"
+    for piece in path.split(";")[1:]:
+        if piece.isdigit():
+            p += "[%s]" % piece
+        else:
+            p += "['%s']" % piece
+    return p
+
+
+def _end_step(obj, path, context):
+    context.store(obj, path)
+
+
+def _trace_step(loc, step):
+    """调试模式下在执行步骤前打印当前的loc、路径以及对象类型"""
+
+    def traced(obj, path, context):
+        print("trace", loc, "/", path)
+        print("\t", loc, type(obj))
+        step(obj, path, context)
+
+    return traced
+
+
+def _compile_seq(locs, nxt, debug=0):
+    """把若干个loc依次串联, 最后接上nxt"""
+    for loc in reversed(locs):
+        nxt = _compile_loc(loc, nxt, debug)
+    return nxt
+
+
+def _compile_chain(locs, debug=0):
+    """编译normalize后的完整表达式, 剩余表达式为空(或只剩一个空loc)时保存结果"""
+    if not locs or locs == [""]:
+        return _end_step
+    return _compile_loc(locs[0], _compile_chain(locs[1:], debug), debug)
+
+
+def _dynamic_dispatch(nxt, debug=0):
+    """
+    *、过滤、切片等步骤会把key/下标当作新的loc重新解析, 这里缓存按key编译出的步骤
+    """
+    cache = {}
+
+    def dispatch(key, obj, path, context):
+        step = cache.get(key)
+        if step is None:
+            if len(cache) >= _DYNAMIC_CACHE_SIZE:
+                cache.clear()
+            step = cache[key] = _compile_seq(key.split(";"), nxt, debug)
+        step(obj, path, context)
+
+    return dispatch
+
+
+def _compile_loc(loc, nxt, debug=0):
+    """
+    把单个loc编译为步骤函数step(obj, path, context), 匹配后调用nxt; debug时每个步骤执行前打印trace
+    """
+    step = _compile_loc_step(loc, nxt, debug)
+    return _trace_step(loc, step) if debug else step
+
+
+def _compile_loc_step(loc, nxt, debug):
+    dispatch = _dynamic_dispatch(nxt, debug)
+
+    def through_key(obj, key, path, context):
+        """普通字符串key直接下钻, 其他key当作新的loc重新解析"""
+        if type(key) is str and key not in _SPECIAL_LOCS and ";" not in key:
+            nxt(obj[key], path + ";" + key, context)
+        else:
+            dispatch(str(key), obj, path, context)
+
+    if loc == "*":
+        def wildcard(obj, path, context):
+            if isinstance(obj, list):
+                for i in range(len(obj)):
+                    nxt(obj[i], path + ";" + str(i), context)
+            elif isinstance(obj, dict):
+                for key in obj:
+                    through_key(obj, key, path, context)
+
+        return wildcard
+
+    if loc == "..":
+        def descendant(obj, path, context):
+            nxt(obj, path, context)
+            if isinstance(obj, list):
+                for i in range(len(obj)):
+                    descendant(obj[i], path + ";" + str(i), context)
+            elif isinstance(obj, dict):
+                for key in obj:
+                    descendant(obj[key], path + ";" + str(key), context)
+
+        return descendant
+
+    if loc == "!":
+        def key_names(obj, path, context):
+            if isinstance(obj, dict):
+                for key in obj:
+                    nxt(key, path, context)
+
+        return key_names
+
+    is_digit = loc.isdigit()
+    index = int(loc) if is_digit else None
+    if loc.startswith("(") and loc.endswith(")"):
+        evaluate = _compile_filter(loc, debug)
+
+        def index_expr(obj, path, context):
+            dispatch(str(evaluate(obj, context)), obj, path, context)
+
+        fallback = index_expr
+    elif loc.startswith("?(") and loc.endswith(")"):
+        predicate = _compile_filter(loc[2:-1], debug)
+
+        def filter_expr(obj, path, context):
+            if isinstance(obj, list):
+                for i in range(len(obj)):
+                    if predicate(obj[i], context):
+                        nxt(obj[i], path + ";" + str(i), context)
+            elif isinstance(obj, dict):
+                for key in obj:
+                    if predicate(obj[key], context):
+                        through_key(obj, key, path, context)
+
+        fallback = filter_expr
+    elif _SLICE_PATTERN.match(loc):
+        s0, s1, s2 = _SLICE_PATTERN.match(loc).groups()
+
+        def slice_expr(obj, path, context):
+            if not isinstance(obj, (dict, list)):
+                return
+            size = len(obj)
+            start = int(s0) if s0 else 0
+            end = int(s1) if s1 else size
+            step = int(s2) if s2 else 1
+            start = max(0, start + size) if start < 0 else min(size, start)
+            end = max(0, end + size) if end < 0 else min(size, end)
+            for i in range(start, end, step):
+                if isinstance(obj, list):
+                    if i < size:
+                        nxt(obj[i], path + ";" + str(i), context)
+                else:
+                    dispatch(str(i), obj, path, context)
+
+        fallback = slice_expr
+    elif loc.find(",") >= 0:
+        pieces = [_compile_loc(piece, nxt, debug) for piece in _PIECE_PATTERN.split(loc)]
+
+        def union(obj, path, context):
+            for piece in pieces:
+                piece(obj, path, context)
+
+        fallback = union
+    else:
+        fallback = None
+
+    def member(obj, path, context):
+        if isinstance(obj, dict) and loc in obj:
+            nxt(obj[loc], path + ";" + loc, context)
+        elif isinstance(obj, list) and is_digit:
+            if len(obj) > index:
+                nxt(obj[index], path + ";" + loc, context)
+        elif fallback is not None:
+            fallback(obj, path, context)
+
+    return member
+
+
+class _FindContext:
+    """单次查询的上下文: 保存结果的函数(多路径提取时为按列排列的结果列表)以及退回eval时需要的参数"""
+    __slots__ = ("store", "use_eval", "caller_globals")
+
+    def __init__(self, store, use_eval, caller_globals):
+        self.store = store
+        self.use_eval = use_eval
+        self.caller_globals = caller_globals
+
+
+def _make_store(result, result_type):
+    if result_type == "VALUE":
+        return lambda obj, path: result.append(obj)
+    if result_type == "IPATH":
+        return lambda obj, path: result.append(path.split(";")[1:])
+    return lambda obj, path: result.append(_as_path(path))
+
+
+class JsonPath:
+    """
+    预编译的JsonHand表达式, 解析一次后由闭包组成, 过滤表达式不经过eval, 可重复用于大量文档
+    Examples:
+        >>> path = JsonHand.compile("$.data[?(@.year > 2015)].months[*].url")
+        >>> [path.find(doc) for doc in docs]
+    """
+
+    def __init__(self, expr, debug=0):
+        self.expr = expr
+        self.locs = JsonPath.split_expr(expr)
+        self._step = _compile_chain(self.locs, debug)
+
+    @staticmethod
+    def split_expr(expr):
+        """normalize后拆分为loc列表, 末尾的空loc视为结束"""
+        cleaned_expr = JsonHand.normalize(expr) if expr else ""
+        if cleaned_expr.startswith("$;"):
+            cleaned_expr = cleaned_expr[2:]
+        locs = cleaned_expr.split(";")
+        if locs[-1] == "":
+            locs.pop()
+        return locs
+
+    def __repr__(self):
+        return "JsonPath(%r)" % self.expr
+
+    def find(self, obj, result_type="VALUE", use_eval=True, caller_globals=None):
+        """
+        查询, 返回值与JsonHand.find一致: 有结果时为list, 否则为False
+        Args:
+            obj: 需要查询的对象
+            result_type: VALUE/IPATH/PATH
+            use_eval: 表达式中含有自定义函数时是否允许退回eval
+            caller_globals: 退回eval时使用的globals, 默认为调用方模块
+
+        Returns:
+
+        """
+        if not self.expr or not obj:
+            return False
+        if caller_globals is None:
+            caller_globals = sys._getframe(1).f_globals
+        result = []
+        self._step(obj, "$", _FindContext(_make_store(result, result_type), use_eval, caller_globals))
+        return result if result else False
+
+
+@lru_cache(maxsize=256)
+def _compile_json_path(expr, debug=0):
+    return JsonPath(expr, debug)
+
+
+def _column_end_step(index, result_type):
+    """多路径提取的结束步骤, 此时context.store为按列排列的结果列表"""
+    if result_type == "VALUE":
+        def end(obj, path, context):
+            context.store[index].append(obj)
+    elif result_type == "IPATH":
+        def end(obj, path, context):
+            context.store[index].append(path.split(";")[1:])
+    else:
+        def end(obj, path, context):
+            context.store[index].append(_as_path(path))
+    return end
+
+
+def _compile_trie(node, result_type):
+    """
+    把共享前缀的路径编译为一棵步骤树, 节点匹配后先保存在此结束的列, 再依次进入各个子步骤;
+    对单个路径来说调用顺序与单独查询时一致, 因此每列的结果顺序不变
+    """
+    steps = [_column_end_step(index, result_type) for index in node["ends"]]
+    steps.extend(_compile_loc(loc, _compile_trie(child, result_type)) for loc, child in node["children"].items())
+    if len(steps) == 1:
+        return steps[0]
+
+    def fan_out(obj, path, context):
+        for step in steps:
+            step(obj, path, context)
+
+    return fan_out
+
+
+_NDJSON_EXTRACTOR = None
+
+
+def _init_ndjson_worker(paths, options):
+    global _NDJSON_EXTRACTOR
+    _NDJSON_EXTRACTOR = JsonExtractor(paths, **options)
+
+
+def _extract_ndjson_lines(lines):
+    return [_NDJSON_EXTRACTOR.extract(json.loads(line)) for line in lines if line.strip()]
+
+
+class JsonExtractor:
+    """
+    从同一批文档中提取多个路径, 所有路径编译为一次共享的遍历, 每个文档只遍历一次
+    Examples:
+        >>> extractor = JsonHand.extractor({"year": "$.data[*].year", "url": "$..url"}, first=True)
+        >>> extractor.extract(doc)
+        {'year': 2016, 'url': 'https://...'}
+        >>> extractor.columns(docs)["url"]
+        >>> for row in extractor.iter_ndjson("feed.ndjson", processes=4):
+        ...     print(row)
+    """
+
+    def __init__(self, paths, result_type="VALUE", first=False, default=None, use_eval=True, caller_globals=None):
+        """初始化
+        :param paths(dict): {列名: JsonHand表达式}
+        :param result_type(str): VALUE/IPATH/PATH
+        :param first(bool): 每列只取第一个结果, 没有结果时为default
+        :param default: first=True时没有结果的默认值
+        :param use_eval(bool): 表达式中含有自定义函数时是否允许退回eval
+        :param caller_globals(dict): 退回eval时使用的globals, 默认为调用方模块
+        """
+        self.paths = dict(paths)
+        self.names = list(self.paths)
+        self.result_type = result_type
+        self.first = first
+        self.default = default
+        self.use_eval = use_eval
+        self._caller_globals = caller_globals if caller_globals is not None else sys._getframe(1).f_globals
+        root = {"ends": [], "children": {}}
+        for index, name in enumerate(self.names):
+            expr = self.paths[name]
+            if not expr:
+                continue
+            node = root
+            for loc in JsonPath.split_expr(expr):
+                node = node["children"].setdefault(loc, {"ends": [], "children": {}})
+            node["ends"].append(index)
+        self._step = _compile_trie(root, result_type)
+
+    def extract(self, obj):
+        """
+        提取单个文档
+        Args:
+            obj: 文档
+
+        Returns:
+            dict: {列名: 结果}, 结果与JsonHand.find一致(没有结果时为False), first=True时为第一个结果或default
+        """
+        results = [[] for _ in self.names]
+        if obj:
+            self._step(obj, "$", _FindContext(results, self.use_eval, self._caller_globals))
+        if self.first:
+            return {name: result[0] if result else self.default for name, result in zip(self.names, results)}
+        return {name: result if result else False for name, result in zip(self.names, results)}
+
+    def rows(self, docs):
+        """逐个文档提取, 返回生成器"""
+        for doc in docs:
+            yield self.extract(doc)
+
+    def columns(self, docs):
+        """
+        按列汇总
+        Returns:
+            dict: {列名: [每个文档的结果, ...]}
+        """
+        return self._to_columns(self.rows(docs))
+
+    def _to_columns(self, rows):
+        columns = {name: [] for name in self.names}
+        for row in rows:
+            for name in self.names:
+                columns[name].append(row[name])
+        return columns
+
+    def iter_ndjson(self, source, processes=None, chunk_size=1000, encoding="utf-8"):
+        """
+        逐行读取NDJSON并提取, 结果顺序与文件行顺序一致(跳过空行)
+        Args:
+            source: 文件路径或文本文件对象
+            processes: 进程数, None/0/1时在当前进程中处理; 多进程模式下不支持需要退回eval的表达式(如调用方模块中的函数)
+            chunk_size: 每个任务包含的行数
+            encoding: 文件编码
+
+        Returns:
+            生成器
+        """
+        if isinstance(source, (str, bytes)):
+            with open(source, "r", encoding=encoding) as f:
+                yield from self.iter_ndjson(f, processes, chunk_size)
+            return
+        if not processes or processes <= 1:
+            for line in source:
+                if line.strip():
+                    yield self.extract(json.loads(line))
+            return
+
+        # 子进程中拿不到调用方的globals, 需要eval的表达式无法得到与单进程一致的结果
+        for name in self.names:
+            expr = self.paths[name]
+            if expr and any(_loc_needs_eval(loc) for loc in JsonPath.split_expr(expr)):
+                raise ValueError("expression %r of %r needs eval, which is not supported with processes > 1"
+                                 % (expr, name))
+        options = {"result_type": self.result_type, "first": self.first, "default": self.default,
+                   "use_eval": False}
+        chunks = iter(lambda: list(islice(source, chunk_size)), [])
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_ndjson_worker,
+                                 initargs=(self.paths, options)) as executor:
+            # 最多保持processes*2个任务在途, 避免一次把整个文件读入内存
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_extract_ndjson_lines, chunk))
+                if len(pending) >= processes * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def ndjson_columns(self, source, processes=None, chunk_size=1000, encoding="utf-8"):
+        """读取NDJSON并按列汇总, 参数同iter_ndjson"""
+        return self._to_columns(self.iter_ndjson(source, processes, chunk_size, encoding))
+
+
+_PATH_PIECE_PATTERN = re.compile(r"\['(.*?)'\](?=\[|$)|\[(\d+)\]")
+
+
+def _is_plain_loc(loc):
+    """只按key/下标取值的loc, 不匹配时不会进入(expr)/过滤/切片/多选等分支"""
+    return loc not in _SPECIAL_LOCS and not loc.startswith("(") and not loc.startswith("?(") \
+        and not _SLICE_PATTERN.match(loc) and loc.find(",") < 0
+
+
+class JsonIndex:
+    """
+    对同一个大文档建立索引, 只遍历一次, 之后..name、..*、..查询直接查表, 其它步骤仍按JsonHand.find的规则执行
+    索引为构建时的快照, 文档被修改后需要重新构建
+    Examples:
+        >>> index = JsonHand.index(big_response)
+        >>> index.find("$..url"), index.find("$.data..months[*].count")
+        >>> index.paths_of("url"), index.value_at("$['data'][0]['year']")
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+        # 先序遍历的节点, 与..的访问顺序一致
+        self.paths = []
+        self.values = []
+        self.positions = {}
+        self.ends = []
+        # key -> (父节点先序位置列表, [(子节点, 路径)]), 按父节点的访问顺序追加, 可以按子树范围二分
+        self.key_index = {}
+        self.child_parents = []
+        self.child_entries = []
+        # dict中存在非字符串key或*、..、!、含;的key时, 路径可能重复或需要重新解析, 不使用索引加速
+        self.regular = True
+        self._compiled = {}
+        self._build()
+
+    def _build(self):
+        parents = []
+        stack = [(self.obj, "$", -1)]
+        while stack:
+            value, path, parent = stack.pop()
+            pos = len(self.paths)
+            self.paths.append(path)
+            self.values.append(value)
+            parents.append(parent)
+            if path in self.positions:
+                self.regular = False
+            self.positions[path] = pos
+            if isinstance(value, list):
+                children = [(str(i), item) for i, item in enumerate(value)]
+            elif isinstance(value, dict):
+                children = []
+                for key, item in value.items():
+                    if type(key) is not str or key in _SPECIAL_LOCS or ";" in key:
+                        self.regular = False
+                    children.append((str(key), item))
+            else:
+                continue
+            entries = []
+            for key, item in children:
+                entry = (item, path + ";" + key)
+                parents_of_key, entries_of_key = self.key_index.setdefault(key, ([], []))
+                parents_of_key.append(pos)
+                entries_of_key.append(entry)
+                entries.append(entry)
+            self.child_parents.extend([pos] * len(entries))
+            self.child_entries.extend(entries)
+            stack.extend((item, item_path, pos) for item, item_path in reversed(entries))
+
+        # 子树在先序序列中是连续的区间[pos, ends[pos])
+        sizes = [1] * len(self.paths)
+        for pos in range(len(self.paths) - 1, 0, -1):
+            sizes[parents[pos]] += sizes[pos]
+        self.ends = [pos + size for pos, size in enumerate(sizes)]
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _subtree(self, obj, path):
+        """当前节点在先序序列中的区间, 节点不属于索引时返回None"""
+        pos = self.positions.get(path)
+        if pos is None or self.values[pos] is not obj:
+            return None
+        return pos, self.ends[pos]
+
+    def _indexed_step(self, parents, entries, nxt, general):
+        """在子树范围内查表, 依次对命中的子节点执行后续步骤"""
+
+        def step(obj, path, context):
+            bounds = self._subtree(obj, path)
+            if bounds is None:
+                general(obj, path, context)
+                return
+            for item, item_path in entries[bisect_left(parents, bounds[0]):bisect_left(parents, bounds[1])]:
+                nxt(item, item_path, context)
+
+        return step
+
+    def _compile(self, locs):
+        if not locs:
+            return _end_step
+        if locs[0] != ".." or not self.regular:
+            return _compile_loc(locs[0], self._compile(locs[1:]))
+
+        rest = locs[1:]
+        general = _compile_loc("..", self._compile(rest))
+        if not rest:
+            def all_nodes(obj, path, context):
+                bounds = self._subtree(obj, path)
+                if bounds is None:
+                    general(obj, path, context)
+                    return
+                for pos in range(*bounds):
+                    context.store(self.values[pos], self.paths[pos])
+
+            return all_nodes
+        if rest[0] == "*":
+            return self._indexed_step(self.child_parents, self.child_entries, self._compile(rest[1:]), general)
+        if _is_plain_loc(rest[0]):
+            parents, entries = self.key_index.get(rest[0], ([], []))
+            return self._indexed_step(parents, entries, self._compile(rest[1:]), general)
+        return general
+
+    def find(self, expr, result_type="VALUE", use_eval=True, caller_globals=None):
+        """
+        查询, 结果与JsonHand.find(obj, expr)一致
+        Args:
+            expr: JsonHand表达式
+            result_type: VALUE/IPATH/PATH
+            use_eval: 表达式中含有自定义函数时是否允许退回eval
+            caller_globals: 退回eval时使用的globals, 默认为调用方模块
+
+        Returns:
+
+        """
+        if not expr or not self.obj:
+            return False
+        step = self._compiled.get(expr)
+        if step is None:
+            if len(self._compiled) >= _DYNAMIC_CACHE_SIZE:
+                self._compiled.clear()
+            step = self._compiled[expr] = self._compile(JsonPath.split_expr(expr))
+        if caller_globals is None:
+            caller_globals = sys._getframe(1).f_globals
+        result = []
+        step(self.obj, "$", _FindContext(_make_store(result, result_type), use_eval, caller_globals))
+        return result if result else False
+
+    def paths_of(self, key, result_type="PATH"):
+        """
+        key出现的所有位置, 等价于find("$..key", result_type)
+        Args:
+            key: dict的key或列表下标
+            result_type: PATH/IPATH
+
+        Returns:
+            list
+        """
+        _, entries = self.key_index.get(str(key), ([], []))
+        if result_type == "IPATH":
+            return [path.split(";")[1:] for _, path in entries]
+        return [_as_path(path) for _, path in entries]
+
+    def value_at(self, path, default=None):
+        """
+        按路径取值
+        Args:
+            path: PATH格式的字符串(如$['data'][0])或IPATH格式的列表(如['data', '0'])
+            default: 路径不存在时的返回值
+
+        Returns:
+
+        """
+        if isinstance(path, str):
+            pieces = [key if index == "" else index for key, index in _PATH_PIECE_PATTERN.findall(path)]
+        else:
+            pieces = [str(piece) for piece in path]
+        pos = self.positions.get(";".join(["$"] + pieces))
+        return default if pos is None else self.values[pos]
+
+
 class JsonHand:
     @staticmethod
     def normalize(filter):
@@ -672,6 +1824,55 @@ class JsonHand:
         filter = re.sub(r"#([0-9]+)", f2, filter)
         return filter
 
+    @staticmethod
+    def compile(expr):
+        """
+        预编译表达式, 结果带有LRU缓存, 同一个表达式只解析一次
+        Args:
+            expr: JsonHand表达式
+
+        Returns:
+            JsonPath
+
+        Examples:
+            >>> path = JsonHand.compile("$..months[?(@.count > 0)].url")
+            >>> path.find(data)
+        """
+        return _compile_json_path(expr)
+
+    @staticmethod
+    def extractor(paths, **kwargs):
+        """
+        创建多路径提取器, 所有路径共享一次遍历
+        Args:
+            paths: {列名: JsonHand表达式}
+            **kwargs: 透传给JsonExtractor, 如result_type/first/default
+
+        Returns:
+            JsonExtractor
+
+        Examples:
+            >>> JsonHand.extractor({"year": "$.data[*].year", "url": "$..url"}).extract(data)
+        """
+        kwargs.setdefault("caller_globals", sys._getframe(1).f_globals)
+        return JsonExtractor(paths, **kwargs)
+
+    @staticmethod
+    def index(obj):
+        """
+        为同一个大文档建立路径索引, 适用于对同一个文档反复查询(尤其是..递归查询)
+        Args:
+            obj: 文档
+
+        Returns:
+            JsonIndex
+
+        Examples:
+            >>> index = JsonHand.index(data)
+            >>> index.find("$..url"), index.paths_of("url")
+        """
+        return JsonIndex(obj)
+
     @staticmethod
     def find(obj, expr, result_type="VALUE", debug=0, use_eval=True):
         """
@@ -687,237 +1888,10 @@ class JsonHand:
         n/a	()	支持表达式计算
         ()	n/a	分组，JsonHand不支持
         """
-
-        def s(x, y):
-            """concatenate path elements"""
-            return str(x) + ";" + str(y)
-
-        def isint(x):
-            """check if argument represents a decimal integer"""
-            return x.isdigit()
-
-        def as_path(path):
-            """convert internal path representation to
-            "full bracket notation" for PATH output"""
-            p = "$"
-            for piece in path.split(";")[1:]:
-                # make a guess on how to index
-                # XXX need to apply \ quoting on '!!
-                if isint(piece):
-                    p += "[%s]" % piece
-                else:
-                    p += "['%s']" % piece
-            return p
-
-        def store(path, object):
-            if result_type == "VALUE":
-                result.append(object)
-            elif result_type == "IPATH":  # Index format path (Python ext)
-                # return list of list of indices -- can be used w/o "eval" or
-                # split
-                result.append(path.split(";")[1:])
-            else:  # PATH
-                result.append(as_path(path))
-            return path
-
-        def trace(expr, obj, path):
-            if debug:
-                print("trace", expr, "/", path)
-            if expr:
-                x = expr.split(";")
-                loc = x[0]
-                x = ";".join(x[1:])
-                if debug:
-                    print("\t", loc, type(obj))
-                if loc == "*":
-
-                    def f03(key, loc, expr, obj, path):
-                        if debug > 1:
-                            print(r"\tf03", key, loc, expr, path)
-                        trace(s(key, expr), obj, path)
-
-                    walk(loc, x, obj, path, f03)
-                elif loc == "..":
-                    trace(x, obj, path)
-
-                    def f04(key, loc, expr, obj, path):
-                        if debug > 1:
-                            print(r"\tf04", key, loc, expr, path)
-                        if isinstance(obj, dict):
-                            if key in obj:
-                                trace(s("..", expr), obj[key], s(path, key))
-                        else:
-                            if key < len(obj):
-                                trace(s("..", expr), obj[key], s(path, key))
-
-                    walk(loc, x, obj, path, f04)
-                elif loc == "!":
-
-                    def f06(key, loc, expr, obj, path):
-                        if isinstance(obj, dict):
-                            trace(expr, key, path)
-
-                    walk(loc, x, obj, path, f06)
-                elif isinstance(obj, dict) and loc in obj:
-                    trace(x, obj[loc], s(path, loc))
-                elif isinstance(obj, list) and isint(loc):
-                    iloc = int(loc)
-                    if debug:
-                        print("----->", iloc, len(obj))
-                    if len(obj) > iloc:
-                        trace(x, obj[iloc], s(path, loc))
-                else:
-                    # [(index_expression)]
-                    if loc.startswith("(") and loc.endswith(")"):
-                        if debug > 1:
-                            print("index", loc)
-                        e = evalx(loc, obj)
-                        trace(s(e, x), obj, path)
-                        return
-
-                    # ?(filter_expression)
-                    if loc.startswith("?(") and loc.endswith(")"):
-                        if debug > 1:
-                            print("filter", loc)
-
-                        def f05(key, loc, expr, obj, path):
-                            if debug > 1:
-                                print("f05", key, loc, expr, path)
-                            if isinstance(obj, dict):
-                                eval_result = evalx(loc, obj[key])
-                            else:
-                                eval_result = evalx(loc, obj[int(key)])
-                            if eval_result:
-                                trace(s(key, expr), obj, path)
-
-                        loc = loc[2:-1]
-                        walk(loc, x, obj, path, f05)
-                        return
-
-                    m = re.match(r"(-?[0-9]*):(-?[0-9]*):?(-?[0-9]*)$", loc)
-                    if m:
-                        if isinstance(obj, (dict, list)):
-
-                            def max(x, y):
-                                if x > y:
-                                    return x
-                                return y
-
-                            def min(x, y):
-                                if x < y:
-                                    return x
-                                return y
-
-                            objlen = len(obj)
-                            s0 = m.group(1)
-                            s1 = m.group(2)
-                            s2 = m.group(3)
-
-                            # XXX int("badstr") raises exception
-                            start = int(s0) if s0 else 0
-                            end = int(s1) if s1 else objlen
-                            step = int(s2) if s2 else 1
-
-                            if start < 0:
-                                start = max(0, start + objlen)
-                            else:
-                                start = min(objlen, start)
-                            if end < 0:
-                                end = max(0, end + objlen)
-                            else:
-                                end = min(objlen, end)
-
-                            for i in range(start, end, step):
-                                trace(s(i, x), obj, path)
-                        return
-
-                    # after (expr) & ?(expr)
-                    if loc.find(",") >= 0:
-                        # [index,index....]
-                        for piece in re.split(r"'?,'?", loc):
-                            if debug > 1:
-                                print("piece", piece)
-                            trace(s(piece, x), obj, path)
-            else:
-                store(path, obj)
-
-        def walk(loc, expr, obj, path, funct):
-            if isinstance(obj, list):
-                for i in range(0, len(obj)):
-                    funct(i, loc, expr, obj, path)
-            elif isinstance(obj, dict):
-                for key in obj:
-                    funct(key, loc, expr, obj, path)
-
-        def evalx(loc, obj):
-            """eval expression"""
-            if debug:
-                print("evalx", loc)
-            # a nod to JavaScript. doesn't work for @.name.name.length
-            # Write len(@.name.name) instead!!!
-            loc = loc.replace("@.length", "len(__obj)")
-            loc = loc.replace("&&", " and ").replace("||", " or ")
-
-            # replace !@.name with 'name' not in obj
-            # XXX handle !@.name.name.name....
-            def notvar(m):
-                return "'%s' not in __obj" % m.group(1)
-
-            loc = re.sub(r"!@\.([a-zA-Z@_0-9-]*)", notvar, loc)
-
-            # replace @.name.... with __obj['name']....
-            # handle @.name[.name...].length
-            def varmatch(m):
-                def brackets(elts):
-                    ret = "__obj"
-                    for e in elts:
-                        if isint(e):
-                            ret += "[%s]" % e  # ain't necessarily so
-                        else:
-                            ret += "['%s']" % e  # XXX beware quotes!!!!
-                    return ret
-
-                g1 = m.group(1)
-                elts = g1.split(".")
-                if elts[-1] == "length":
-                    return "len(%s)" % brackets(elts[1:-1])
-                return brackets(elts[1:])
-
-            loc = re.sub(r"(?<!\\)(@\.[a-zA-Z@_.0-9]+)", varmatch, loc)
-            # removed = -> == translation
-            # causes problems if a string contains =
-            # replace @  w/ "__obj", but \@ means a literal @
-            loc = re.sub(r"(?<!\\)@", "__obj", loc).replace(r"\@", "@")
-            if not use_eval:
-                if debug:
-                    print("eval disabled")
-                raise Exception("eval disabled")
-            if debug:
-                print("eval", loc)
-            try:
-                # eval w/ caller globals, w/ local "__obj"!
-                v = eval(loc, caller_globals, {"__obj": obj})
-            except Exception as e:
-                if debug:
-                    print(repr(e))
-                return False
-
-            if debug:
-                print("->", v)
-            return v
-
-        # body of JsonHand()
-        # Get caller globals so eval can pick up user functions!!!
-        caller_globals = sys._getframe(1).f_globals
-        result = []
         if expr and obj:
-            cleaned_expr = JsonHand.normalize(expr)
-            if cleaned_expr.startswith("$;"):
-                cleaned_expr = cleaned_expr[2:]
-            # XXX wrap this in a try??
-            trace(cleaned_expr, obj, "$")
-            if len(result) > 0:
-                return result
+            # 使用预编译并缓存的表达式, debug时编译为每一步都打印trace的版本
+            return _compile_json_path(expr, 1 if debug else 0).find(
+                obj, result_type, use_eval, sys._getframe(1).f_globals)
         return False
 
 
@@ -11,10 +11,193 @@
 """
 
 import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from itertools import repeat
+from string import ascii_letters, ascii_lowercase, ascii_uppercase, digits, punctuation
 from typing import Any
 
 from hutools.cron import BatchTask
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# 各格式的正则只编译一次, key为RegEx中去掉match_前缀的方法名
+_PATTERNS = {
+    "email": re.compile("^.+\\@(\\[?)[a-zA-Z0-9\\-\\.]+\\.([a-zA-Z]{2,3}|[0-9]{1,3})(\\]?)"),
+    "double_byte_str": re.compile(r".*?([^x00-xff])"),
+    "mobile": re.compile(
+        "^(?:(?:\\+|00)86)?1(?:(?:3[\\d])|(?:4[5-79])|"
+        "(?:5[0-35-9])|(?:6[5-7])|(?:7[0-8])|(?:8[\\d])|(?:9[189]))\\d{8}"
+    ),
+    "ipv4": re.compile(r"^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$"),
+    "valid_url": re.compile(r"^(((ht|f)tps?):\/\/)?[\w-]+(\.[\w-]+)+([\w.@?^=%&:/~+#-]*[\w@?^=%&/~+#-])?$"),
+    "train_number": re.compile("^[GCDZTSPKXLY1-9]\d{1,4}$"),
+    "phone_imei": re.compile("^\d{15,17}$"),
+    "ip": re.compile("^((ht|f)tps?:\/\/)?[\w-]+(\.[\w-]+)+:\d{1,5}\/?$"),
+    "url": re.compile("^(((ht|f)tps?):\/\/)?([^!@#$%^&*?.\s-]([^!@#$%^&*?.\s]{0,63}[^!@#$%^&*?.\s])?\.)+[a-z]{2,6}\/?"),
+    "social_credit": re.compile("^[0-9A-HJ-NPQRTUWXY]{2}\d{6}[0-9A-HJ-NPQRTUWXY]{10}$"),
+    "easy_social_credit": re.compile("^(([0-9A-Za-z]{15})|([0-9A-Za-z]{18})|([0-9A-Za-z]{20}))$"),
+    "net_mask": re.compile("^(254|252|248|240|224|192|128)\.0\.0\.0|255\.(254|252|248|240|224|192|128|0)\.0\.0|255\.255\.(254|252|248|240|224|192|128|0)\.0|255\.255\.255\.(255|254|252|248|240|224|192|128|0)$"),
+    "md5_format": re.compile("^([a-f\d]{32}|[A-F\d]{32})$"),
+    "uuid_format": re.compile("^[a-f\d]{4}(?:[a-f\d]{4}-){4}[a-f\d]{12}$/i"),
+    "version_format": re.compile("^\d+(?:\.\d+){2}$"),
+    "image_url_format": re.compile("^https?:\/\/(.+\/)+.+(\.(gif|png|jpg|jpeg|webp|svg|psd|bmp|tif))$"),
+    "video_url_format": re.compile("^https?:\/\/(.+\/)+.+(\.(swf|avi|flv|mpg|rm|mov|wav|asf|3gp|mkv|rmvb|mp4))$"),
+    "24hms_time_format": re.compile("^(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d$"),
+    "12hms_time_format": re.compile("^(?:1[0-2]|0?[1-9]):[0-5]\d:[0-5]\d$"),
+    "base64_format": re.compile("^\s*data:(?:[a-z]+\/[a-z0-9-+.]+(?:;[a-z-]+=[a-z0-9-]+)?)?(?:;base64)?,([a-z0-9!$&',()*+;=\-._~:@/?%\s]*?)\s*$"),
+    "easy_currency_format": re.compile("^-?\d+(,\d{3})*(\.\d{1,2})?$"),
+    "chinese_name": re.compile("^(?:[\u4e00-\u9fa5·]{2,16})$"),
+    "english_name": re.compile("(^[a-zA-Z][a-zA-Z\s]{0,20}[a-zA-Z]$)"),
+    "only_chinese": re.compile(
+        "^(?:[\u3400-\u4DB5\u4E00-\u9FEA\uFA0E\uFA0F\uFA11\uFA13\uFA14\uFA1F\uFA21\uFA23\uFA24\uFA27-\uFA29]|"
+        "[\uD840-\uD868\uD86A-\uD86C\uD86F-\uD872\uD874-\uD879][\uDC00-\uDFFF]|"
+        "\uD869[\uDC00-\uDED6\uDF00-\uDFFF]|\uD86D[\uDC00-\uDF34\uDF40-\uDFFF]|"
+        "\uD86E[\uDC00-\uDC1D\uDC20-\uDFFF]|\uD873[\uDC00-\uDEA1\uDEB0-\uDFFF]|"
+        "\uD87A[\uDC00-\uDFE0])+$"
+    ),
+    "only_english": re.compile("^[a-zA-Z]+$"),
+    "only_decimals": re.compile("^\d+\.\d+$/"),
+    "only_number": re.compile("^\d+$"),
+    "only_number_and_letters": re.compile("^[A-Za-z0-9]+$"),
+    "only_lowe_letters": re.compile("^[a-z]+$"),
+    "only_upper_letters": re.compile("^[A-Z]+$"),
+    "only_chinese_and_number": re.compile(
+        "^((?:[\u3400-\u4DB5\u4E00-\u9FEA\uFA0E\uFA0F\uFA11\uFA13\uFA14\uFA1F\uFA21\uFA23\uFA24\uFA27-\uFA29]|"
+        "[\uD840-\uD868\uD86A-\uD86C\uD86F-\uD872\uD874-\uD879][\uDC00-\uDFFF]|"
+        "\uD869[\uDC00-\uDED6\uDF00-\uDFFF]|\uD86D[\uDC00-\uDF34\uDF40-\uDFFF]|"
+        "\uD86E[\uDC00-\uDC1D\uDC20-\uDFFF]|\uD873[\uDC00-\uDEA1\uDEB0-\uDFFF]|"
+        "\uD87A[\uDC00-\uDFE0])|(\d))+$"
+    ),
+    "not_exists_letters": re.compile(
+        "^((?:[\u3400-\u4DB5\u4E00-\u9FEA\uFA0E\uFA0F\uFA11\uFA13\uFA14\uFA1F\uFA21\uFA23\uFA24\uFA27-\uFA29]|"
+        "[\uD840-\uD868\uD86A-\uD86C\uD86F-\uD872\uD874-\uD879][\uDC00-\uDFFF]|"
+        "\uD869[\uDC00-\uDED6\uDF00-\uDFFF]|\uD86D[\uDC00-\uDF34\uDF40-\uDFFF]|"
+        "\uD86E[\uDC00-\uDC1D\uDC20-\uDFFF]|\uD873[\uDC00-\uDEA1\uDEB0-\uDFFF]|"
+        "\uD87A[\uDC00-\uDFE0])|(\d))+$"
+    ),
+    "ascii_special_char": re.compile("[\x21-\x2F\x3A-\x40\x5B-\x60\x7B-\x7E]+"),
+}
+
+_WEAK_PWD_PATTERN = re.compile(r"^(?:(?=.*[0-9].*)(?=.*[A-Za-z].*)(?=.*[\W].*))[\W0-9A-Za-z]{7,20}")
+
+_TRAIL_TYPE_PATTERNS = {
+    "image": re.compile(".*(\.png|\.jpg|\.jpeg|\.gif|\.mov)$"),
+    "video": re.compile(".*(\.mp4|\.avi|\.mkv|\.flv|\.vob)$"),
+    "exe": re.compile(".*(\.exe|\.sh|\.bat)$"),
+    "docs": re.compile(".*(\.md|\.xls|\.xlsx|\.word|\.pdf)$"),
+}
+
+# 超过该数量且指定了多进程时才拆分到子进程
+_PROCESS_CHUNK_SIZE = 100000
+
+
+# classify的预筛选条件, 均为对应正则能匹配的必要条件, 不满足时直接跳过该正则:
+# (最小长度, 最大长度, 首字符范围, 必须包含的子串, 是否只含ASCII字符(True)/首字符必须为非ASCII(False)/不限(None))
+# 最大长度已计入$允许的结尾换行符
+_CLASSIFY_RULES = {
+    "email": (5, None, None, ("@", "."), None),
+    "double_byte_str": (1, None, None, (), None),
+    "mobile": (11, None, "+01", (), None),
+    "ipv4": (7, 16, digits, (".",), True),
+    "valid_url": (3, None, None, (".",), None),
+    "train_number": (2, 6, "GCDZTSPKXLY123456789", (), None),
+    "phone_imei": (15, 18, None, (), None),
+    "ip": (5, None, None, (".", ":"), None),
+    "url": (4, None, None, (".",), None),
+    "social_credit": (18, 19, None, (), None),
+    "easy_social_credit": (15, 21, None, (), True),
+    "net_mask": (7, None, "12", (".",), None),
+    "md5_format": (32, 33, None, (), None),
+    "uuid_format": (36, None, None, ("-",), None),
+    "version_format": (5, None, None, (".",), None),
+    "image_url_format": (12, None, "h", ("://",), None),
+    "video_url_format": (12, None, "h", ("://",), None),
+    "24hms_time_format": (8, 9, "012", (":",), None),
+    "12hms_time_format": (7, 9, digits, (":",), None),
+    "base64_format": (6, None, None, ("data:", ","), None),
+    "easy_currency_format": (1, None, None, (), None),
+    "chinese_name": (2, 17, None, (), False),
+    "english_name": (2, 23, ascii_letters, (), None),
+    "only_chinese": (1, None, None, (), False),
+    "only_english": (1, None, ascii_letters, (), True),
+    "only_decimals": (3, None, None, (".",), None),
+    "only_number": (1, None, None, (), None),
+    "only_number_and_letters": (1, None, ascii_letters + digits, (), True),
+    "only_lowe_letters": (1, None, ascii_lowercase, (), True),
+    "only_upper_letters": (1, None, ascii_uppercase, (), True),
+    "only_chinese_and_number": (1, None, None, (), None),
+    "not_exists_letters": (1, None, None, (), None),
+    "ascii_special_char": (1, None, punctuation, (), None),
+}
+
+
+def _text(context):
+    """字符串原样返回, 其它类型才调用str()"""
+    return context if type(context) is str else str(context)
+
+
+@lru_cache(maxsize=128)
+def _length_pattern(rule, min_length, max_length):
+    """带长度参数的正则, 按参数缓存编译结果"""
+    return re.compile(rule % (min_length, max_length))
+
+
+def _validate_chunk(kind, values, options):
+    """validate_many的子进程任务, 需在模块级定义才能被pickle"""
+    if kind in _PATTERNS:
+        return bytearray(map(bool, map(_PATTERNS[kind].match, map(str, values))))
+    validator = getattr(RegEx, kind if kind in ("weak_pwd", "date_validator") else "match_" + kind)
+    return bytearray(map(bool, (validator(value, **options) for value in values)))
+
+
+# 预筛选条件最多用到的长度, 更长的字符串与该长度使用同一组候选
+_CLASSIFY_MAX_LENGTH = 64
+
+
+@lru_cache(maxsize=64)
+def _classify_plan(kinds):
+    """
+    按字符串长度预先排好的候选列表, 长度越界的格式在第一步就被排除
+    Returns:
+        tuple: plan[length] = ((格式, 首字符范围, 必须包含的子串, ASCII条件, 正则), ...)
+    """
+    return tuple(
+        tuple(
+            (kind, first, needles, ascii_only, _PATTERNS[kind])
+            for kind in kinds
+            for min_length, max_length, first, needles, ascii_only in (_CLASSIFY_RULES[kind],)
+            if length >= min_length and (max_length is None or length <= max_length)
+        )
+        for length in range(_CLASSIFY_MAX_LENGTH + 1)
+    )
+
+
+def _classify_text(text, plan):
+    """单个字符串的分类, 先按长度、首字符、子串、ASCII条件筛选, 只对剩下的格式执行正则"""
+    result = []
+    is_ascii = None
+    head = text[:1]
+    for kind, first, needles, ascii_only, pattern in plan[min(len(text), _CLASSIFY_MAX_LENGTH)]:
+        if first is not None and head not in first:
+            continue
+        if needles and not all(needle in text for needle in needles):
+            continue
+        if ascii_only:
+            if is_ascii is None:
+                is_ascii = text.isascii()
+            if not is_ascii:
+                continue
+        elif ascii_only is False and head.isascii():
+            continue
+        if pattern.match(text) is not None:
+            result.append(kind)
+    return result
+
 
 class RegEx:
 
@@ -29,14 +212,7 @@ class RegEx:
             >>> examples = ["test@163.com","test163.com","155555@qq.com"]
             >>> BatchTask.list_jobs(RegEx.match_email, examples)
         """
-        return (
-            True
-            if re.match(
-                "^.+\\@(\\[?)[a-zA-Z0-9\\-\\.]+\\.([a-zA-Z]{2,3}|[0-9]{1,3})(\\]?)",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["email"].match(_text(context)) is not None
 
     @staticmethod
     def date_validator(value: str) -> bool:
@@ -66,7 +242,7 @@ class RegEx:
             >>> examples = ["哈哈哈", "12356", "abc", "ABC" "QS12356", "QS12356哈哈哈"]
             >>> BatchTask.list_jobs(RegEx.match_double_byte_str, examples)
         """
-        return True if re.match(r".*?([^x00-xff])", str(context)) else False
+        return _PATTERNS["double_byte_str"].match(_text(context)) is not None
 
     @staticmethod
     def weak_pwd(context: Any) -> bool:
@@ -79,15 +255,7 @@ class RegEx:
             >>> examples = ["哈哈哈", "12356", "abc", "ABC" "QS12356", "QS12356哈哈哈", None, "QSa12356@"]
             >>> BatchTask.list_jobs(RegEx.weak_pwd, examples)
         """
-        return (
-            True
-            if re.match(
-                r"^(?:(?=.*[0-9].*)(?=.*[A-Za-z].*)(?=.*[\W].*))[\W0-9A-Za-z]{7,20}",
-                str(context),
-            )
-               is None
-            else False
-        )
+        return _WEAK_PWD_PATTERN.match(_text(context)) is None
 
     @staticmethod
     def match_mobile(context: Any) -> bool:
@@ -101,9 +269,7 @@ class RegEx:
             ... "+8617888829981","008618311006933","19119255552"]
             >>> BatchTask.list_jobs(RegEx.match_mobile, examples)
         """
-        rule = "^(?:(?:\\+|00)86)?1(?:(?:3[\\d])|(?:4[5-79])|" \
-               "(?:5[0-35-9])|(?:6[5-7])|(?:7[0-8])|(?:8[\\d])|(?:9[189]))\\d{8}"
-        return True if re.match(rule, str(context)) else False
+        return _PATTERNS["mobile"].match(_text(context)) is not None
 
     @staticmethod
     def match_ipv4(context: Any) -> bool:
@@ -117,8 +283,7 @@ class RegEx:
             ... "QSa12356@", "+8617888829981","008618311006933","19119255552", "127.16.0.0"]
             >>> BatchTask.list_jobs(RegEx.match_ipv4, examples)
         """
-        rule = r"^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$"
-        return True if re.match(rule, str(context)) else False
+        return _PATTERNS["ipv4"].match(_text(context)) is not None
 
     @staticmethod
     def match_str_length(context: Any, min_length=15, max_length=17) -> bool:
@@ -134,8 +299,7 @@ class RegEx:
             ... "QSa12356@", "+8617888829981","008618311006933","19119255552", "127.16.0.0"]
             >>> BatchTask.list_jobs(RegEx.match_str_length, examples)
         """
-        rule = "^\\d{%s,%s}" % (min_length, max_length)
-        return True if re.match(rule, str(context)) else False
+        return _length_pattern("^\\d{%s,%s}", min_length, max_length).match(_text(context)) is not None
 
     @staticmethod
     def match_username(context, min_length=7, max_length=20):
@@ -151,8 +315,8 @@ class RegEx:
             ... "QSa12356@", "+8617888829981","008618311006933","19119255552", "127.16.0.0"]
             >>> BatchTask.list_jobs(RegEx.match_username, examples)
         """
-        rule = r"^(?=.*[A-Za-z])[a-zA-Z0-9]{%s,%s}" % (min_length, max_length)
-        return True if re.match(rule, str(context)) else False
+        rule = r"^(?=.*[A-Za-z])[a-zA-Z0-9]{%s,%s}"
+        return _length_pattern(rule, min_length, max_length).match(_text(context)) is not None
 
     @staticmethod
     def match_valid_url(context):
@@ -166,8 +330,7 @@ class RegEx:
             ... "QSa12356@", "+8617888829981","008618311006933","19119255552"]
             >>> BatchTask.list_jobs(RegEx.match_valid_url, examples)
         """
-        rule = r"^(((ht|f)tps?):\/\/)?[\w-]+(\.[\w-]+)+([\w.@?^=%&:/~+#-]*[\w@?^=%&/~+#-])?$"
-        return True if re.match(rule, str(context)) else False
+        return _PATTERNS["valid_url"].match(_text(context)) is not None
 
     @staticmethod
     def match_trail_type(context, method=None):
@@ -181,19 +344,8 @@ class RegEx:
             >>> examples = [".bat", ".image", ".png", "image"]
             >>> BatchTask.list_jobs(RegEx.match_trail_type, examples)
         """
-        image = ".*(\.png|\.jpg|\.jpeg|\.gif|\.mov)$"
-        video = ".*(\.mp4|\.avi|\.mkv|\.flv|\.vob)$"
-        exe = ".*(\.exe|\.sh|\.bat)$"
-        docs = ".*(\.md|\.xls|\.xlsx|\.word|\.pdf)$"
-        if method == "image":
-            rule = image
-        elif method == "video":
-            rule = video
-        elif method == "docs":
-            rule = docs
-        else:
-            rule = exe
-        return True if re.match(rule, str(context).lower()) else False
+        rule = _TRAIL_TYPE_PATTERNS.get(method, _TRAIL_TYPE_PATTERNS["exe"])
+        return rule.match(_text(context).lower()) is not None
 
     @staticmethod
     def match_train_number(context: Any) -> bool:
@@ -207,14 +359,7 @@ class RegEx:
             >>> examples = ['G1868', 'D102', 'D9', 'Z5', 'Z26', 'Z17']
             >>> BatchTask.list_jobs(RegEx.match_train_number, examples)
         """
-        return (
-            True
-            if re.match(
-                "^[GCDZTSPKXLY1-9]\d{1,4}$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["train_number"].match(_text(context)) is not None
 
     @staticmethod
     def match_phone_imei(context: Any) -> bool:
@@ -229,14 +374,7 @@ class RegEx:
             >>> examples = ['123556789012355', '1235567890123556', '12355678901235567']
             >>> BatchTask.list_jobs(RegEx.match_phone_imei, examples)
         """
-        return (
-            True
-            if re.match(
-                "^\d{15,17}$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["phone_imei"].match(_text(context)) is not None
 
     @staticmethod
     def match_ip(context: Any) -> bool:
@@ -252,14 +390,7 @@ class RegEx:
             >>> examples = ['https://www.qq.com:8080', '127.0.0.1:5050', 'baidu.com:8001', 'http://192.168.1.1:9090']
             >>> BatchTask.list_jobs(RegEx.match_ip, examples)
         """
-        return (
-            True
-            if re.match(
-                "^((ht|f)tps?:\/\/)?[\w-]+(\.[\w-]+)+:\d{1,5}\/?$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["ip"].match(_text(context)) is not None
 
     @staticmethod
     def match_url(context: Any) -> bool:
@@ -275,14 +406,7 @@ class RegEx:
             >>> examples = ['ftp://baidu.123', 'https://www.amap.com/search?id=BV10060895&city=420111']
             >>> BatchTask.list_jobs(RegEx.match_url, examples)
         """
-        return (
-            True
-            if re.match(
-                "^(((ht|f)tps?):\/\/)?([^!@#$%^&*?.\s-]([^!@#$%^&*?.\s]{0,63}[^!@#$%^&*?.\s])?\.)+[a-z]{2,6}\/?",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["url"].match(_text(context)) is not None
 
     @staticmethod
     def match_social_credit(context: Any) -> bool:
@@ -297,14 +421,7 @@ class RegEx:
             >>> examples = ['91230186MA1B7FLT55', '92371000MA3MXH0E3W']
             >>> BatchTask.list_jobs(RegEx.match_social_credit, examples)
         """
-        return (
-            True
-            if re.match(
-                "^[0-9A-HJ-NPQRTUWXY]{2}\d{6}[0-9A-HJ-NPQRTUWXY]{10}$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["social_credit"].match(_text(context)) is not None
 
     @staticmethod
     def match_easy_social_credit(context: Any) -> bool:
@@ -318,14 +435,7 @@ class RegEx:
             >>> examples = ['91110108772551611J', '911101085923662400']
             >>> BatchTask.list_jobs(RegEx.match_easy_social_credit, examples)
         """
-        return (
-            True
-            if re.match(
-                "^(([0-9A-Za-z]{15})|([0-9A-Za-z]{18})|([0-9A-Za-z]{20}))$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["easy_social_credit"].match(_text(context)) is not None
 
     @staticmethod
     def match_net_mask(context: Any) -> bool:
@@ -340,14 +450,7 @@ class RegEx:
             >>> examples = ['255.255.255.0', '255.255.255.255', '255.240.0.0']
             >>> BatchTask.list_jobs(RegEx.match_net_mask, examples)
         """
-        return (
-            True
-            if re.match(
-                "^(254|252|248|240|224|192|128)\.0\.0\.0|255\.(254|252|248|240|224|192|128|0)\.0\.0|255\.255\.(254|252|248|240|224|192|128|0)\.0|255\.255\.255\.(255|254|252|248|240|224|192|128|0)$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["net_mask"].match(_text(context)) is not None
 
     @staticmethod
     def match_md5_format(context: Any) -> bool:
@@ -361,14 +464,7 @@ class RegEx:
             >>> examples = ['21fe181c5bfc','21fe181c5bfc16306a6828c1f7b762e8']
             >>> BatchTask.list_jobs(RegEx.match_md5_format, examples)
         """
-        return (
-            True
-            if re.match(
-                "^([a-f\d]{32}|[A-F\d]{32})$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["md5_format"].match(_text(context)) is not None
 
     @staticmethod
     def match_uuid_format(context: Any) -> bool:
@@ -382,14 +478,7 @@ class RegEx:
             >>> examples = ['21fe181c5bfc','21fe181c5bfc16306a6828c1f7b762e8','51E3DAF5-6E37-4BCC-9F8E-0D9521E2AA8D']
             >>> BatchTask.list_jobs(RegEx.match_uuid_format, examples)
         """
-        return (
-            True
-            if re.match(
-                "^[a-f\d]{4}(?:[a-f\d]{4}-){4}[a-f\d]{12}$/i",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["uuid_format"].match(_text(context)) is not None
 
     @staticmethod
     def match_version_format(context: Any) -> bool:
@@ -402,14 +491,7 @@ class RegEx:
             >>> RegEx.match_version_format('16.5')
             >>> RegEx.match_version_format('16.5.16')
         """
-        return (
-            True
-            if re.match(
-                "^\d+(?:\.\d+){2}$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["version_format"].match(_text(context)) is not None
 
     @staticmethod
     def match_image_url_format(context: Any) -> bool:
@@ -422,14 +504,7 @@ class RegEx:
             >>> examples = ['www.123.com/logo.png', 'https://www.abc.com/logo.png']
             >>> BatchTask.list_jobs(RegEx.match_image_url_format, examples)
         """
-        return (
-            True
-            if re.match(
-                "^https?:\/\/(.+\/)+.+(\.(gif|png|jpg|jpeg|webp|svg|psd|bmp|tif))$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["image_url_format"].match(_text(context)) is not None
 
     @staticmethod
     def match_video_url_format(context: Any) -> bool:
@@ -442,14 +517,7 @@ class RegEx:
             >>> examples = ['www.123.com/lwc.avi', 'https://www.abc.com/logo.mpg']
             >>> BatchTask.list_jobs(RegEx.match_video_url_format, examples)
         """
-        return (
-            True
-            if re.match(
-                "^https?:\/\/(.+\/)+.+(\.(swf|avi|flv|mpg|rm|mov|wav|asf|3gp|mkv|rmvb|mp4))$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["video_url_format"].match(_text(context)) is not None
 
     @staticmethod
     def match_24hms_time_format(context: Any) -> bool:
@@ -461,14 +529,7 @@ class RegEx:
         Examples:
             >>> RegEx.match_24hms_time_format('23:35:55')
         """
-        return (
-            True
-            if re.match(
-                "^(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["24hms_time_format"].match(_text(context)) is not None
 
     @staticmethod
     def match_12hms_time_format(context: Any) -> bool:
@@ -482,14 +543,7 @@ class RegEx:
             >>> RegEx.match_12hms_time_format('12:00:00')
             >>> RegEx.match_12hms_time_format('23:35:55')
         """
-        return (
-            True
-            if re.match(
-                "^(?:1[0-2]|0?[1-9]):[0-5]\d:[0-5]\d$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["12hms_time_format"].match(_text(context)) is not None
 
     @staticmethod
     def match_base64_format(context: Any) -> bool:
@@ -501,14 +555,7 @@ class RegEx:
         Examples:
             >>> RegEx.match_base64_format('data:image/gif;base64,xxxx==')
         """
-        return (
-            True
-            if re.match(
-                "^\s*data:(?:[a-z]+\/[a-z0-9-+.]+(?:;[a-z-]+=[a-z0-9-]+)?)?(?:;base64)?,([a-z0-9!$&',()*+;=\-._~:@/?%\s]*?)\s*$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["base64_format"].match(_text(context)) is not None
 
     @staticmethod
     def match_easy_currency_format(context: Any) -> bool:
@@ -521,14 +568,7 @@ class RegEx:
             >>> examples = [100, -0.99, 3, 234.32, -1, 900, 235.09, '12,345,678.90']
             >>> BatchTask.list_jobs(RegEx.match_easy_currency_format, examples)
         """
-        return (
-            True
-            if re.match(
-                "^-?\d+(,\d{3})*(\.\d{1,2})?$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["easy_currency_format"].match(_text(context)) is not None
 
     @staticmethod
     def match_chinese_name(context: Any) -> bool:
@@ -541,14 +581,7 @@ class RegEx:
             >>> examples = ['葛二蛋', '凯文·杜兰特', '德克·维尔纳·诺维茨基']
             >>> BatchTask.list_jobs(RegEx.match_chinese_name, examples)
         """
-        return (
-            True
-            if re.match(
-                "^(?:[\u4e00-\u9fa5·]{2,16})$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["chinese_name"].match(_text(context)) is not None
 
     @staticmethod
     def match_english_name(context: Any) -> bool:
@@ -561,14 +594,7 @@ class RegEx:
             >>> examples = ['James', 'Kevin Wayne Durant', 'Dirk Nowitzki']
             >>> BatchTask.list_jobs(RegEx.match_english_name, examples)
         """
-        return (
-            True
-            if re.match(
-                "(^[a-zA-Z][a-zA-Z\s]{0,20}[a-zA-Z]$)",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["english_name"].match(_text(context)) is not None
 
     @staticmethod
     def match_only_chinese(context: Any) -> bool:
@@ -581,19 +607,7 @@ class RegEx:
             >>> examples = ["QS12356","哈哈哈","155555@qq.com","english"]
             >>> BatchTask.list_jobs(RegEx.match_only_chinese, examples)
         """
-        return (
-            True
-            if re.match(
-                # "^[\u4E00-\u9FA5]+$",
-                "^(?:[\u3400-\u4DB5\u4E00-\u9FEA\uFA0E\uFA0F\uFA11\uFA13\uFA14\uFA1F\uFA21\uFA23\uFA24\uFA27-\uFA29]|"
-                "[\uD840-\uD868\uD86A-\uD86C\uD86F-\uD872\uD874-\uD879][\uDC00-\uDFFF]|"
-                "\uD869[\uDC00-\uDED6\uDF00-\uDFFF]|\uD86D[\uDC00-\uDF34\uDF40-\uDFFF]|"
-                "\uD86E[\uDC00-\uDC1D\uDC20-\uDFFF]|\uD873[\uDC00-\uDEA1\uDEB0-\uDFFF]|"
-                "\uD87A[\uDC00-\uDFE0])+$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["only_chinese"].match(_text(context)) is not None
 
     @staticmethod
     def match_only_english(context: Any) -> bool:
@@ -608,14 +622,7 @@ class RegEx:
             ... "QSa12356@", "+8617888829981","008618311006933","19119255552"]
             >>> BatchTask.list_jobs(RegEx.match_only_english, examples)
         """
-        return (
-            True
-            if re.match(
-                "^[a-zA-Z]+$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["only_english"].match(_text(context)) is not None
 
     @staticmethod
     def match_only_decimals(context: Any) -> bool:
@@ -628,14 +635,7 @@ class RegEx:
             >>> examples = ['0.0', '0.09']
             >>> BatchTask.list_jobs(RegEx.match_only_decimals, examples)
         """
-        return (
-            True
-            if re.match(
-                "^\d+\.\d+$/",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["only_decimals"].match(_text(context)) is not None
 
     @staticmethod
     def match_only_number(context: Any) -> bool:
@@ -650,14 +650,7 @@ class RegEx:
             >>> RegEx.match_only_number('class')
             >>> RegEx.match_only_number('啊啊呸啊呸')
         """
-        return (
-            True
-            if re.match(
-                "^\d+$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["only_number"].match(_text(context)) is not None
 
     @staticmethod
     def match_only_number_and_letters(context: Any) -> bool:
@@ -670,14 +663,7 @@ class RegEx:
             >>> examples =  ['james666', '125666', '啊呸']
             >>> BatchTask.list_jobs(RegEx.match_only_number_and_letters, examples)
         """
-        return (
-            True
-            if re.match(
-                "^[A-Za-z0-9]+$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["only_number_and_letters"].match(_text(context)) is not None
 
     @staticmethod
     def match_only_lowe_letters(context: Any) -> bool:
@@ -690,14 +676,7 @@ class RegEx:
             >>> examples = ['russel', 'ABC', '1235678', 'Ab123']
             >>> BatchTask.list_jobs(RegEx.match_only_lowe_letters, examples)
         """
-        return (
-            True
-            if re.match(
-                "^[a-z]+$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["only_lowe_letters"].match(_text(context)) is not None
 
     @staticmethod
     def match_only_upper_letters(context: Any) -> bool:
@@ -710,14 +689,7 @@ class RegEx:
             >>> examples = ['russel', 'ABC', '1235678', 'Ab123']
             >>> BatchTask.list_jobs(RegEx.match_only_upper_letters, examples)
         """
-        return (
-            True
-            if re.match(
-                "^[A-Z]+$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["only_upper_letters"].match(_text(context)) is not None
 
     @staticmethod
     def match_only_chinese_and_number(context: Any) -> bool:
@@ -730,18 +702,7 @@ class RegEx:
             >>> examples = ['哈哈哈', '你好6777啊', 'abc', 'ABC', '1235678', '@¥()！']
             >>> BatchTask.list_jobs(RegEx.match_only_chinese_and_number, examples)
         """
-        return (
-            True
-            if re.match(
-                "^((?:[\u3400-\u4DB5\u4E00-\u9FEA\uFA0E\uFA0F\uFA11\uFA13\uFA14\uFA1F\uFA21\uFA23\uFA24\uFA27-\uFA29]|"
-                "[\uD840-\uD868\uD86A-\uD86C\uD86F-\uD872\uD874-\uD879][\uDC00-\uDFFF]|"
-                "\uD869[\uDC00-\uDED6\uDF00-\uDFFF]|\uD86D[\uDC00-\uDF34\uDF40-\uDFFF]|"
-                "\uD86E[\uDC00-\uDC1D\uDC20-\uDFFF]|\uD873[\uDC00-\uDEA1\uDEB0-\uDFFF]|"
-                "\uD87A[\uDC00-\uDFE0])|(\d))+$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["only_chinese_and_number"].match(_text(context)) is not None
 
     @staticmethod
     def match_not_exists_letters(context: Any) -> bool:
@@ -754,18 +715,7 @@ class RegEx:
             >>> examples = ['哈哈哈', '你好6啊', 'abc', 'ABC', '1235678', '@¥()！']
             >>> BatchTask.list_jobs(RegEx.match_not_exists_letters, examples)
         """
-        return (
-            True
-            if re.match(
-                "^((?:[\u3400-\u4DB5\u4E00-\u9FEA\uFA0E\uFA0F\uFA11\uFA13\uFA14\uFA1F\uFA21\uFA23\uFA24\uFA27-\uFA29]|"
-                "[\uD840-\uD868\uD86A-\uD86C\uD86F-\uD872\uD874-\uD879][\uDC00-\uDFFF]|"
-                "\uD869[\uDC00-\uDED6\uDF00-\uDFFF]|\uD86D[\uDC00-\uDF34\uDF40-\uDFFF]|"
-                "\uD86E[\uDC00-\uDC1D\uDC20-\uDFFF]|\uD873[\uDC00-\uDEA1\uDEB0-\uDFFF]|"
-                "\uD87A[\uDC00-\uDFE0])|(\d))+$",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["not_exists_letters"].match(_text(context)) is not None
 
     @staticmethod
     def match_ascii_special_char(context: Any) -> bool:
@@ -778,11 +728,119 @@ class RegEx:
             >>> examples = ["[", ".", "^", "&3%", "1235678", "abc", "ABC", "ABCa123"]
             >>> BatchTask.list_jobs(RegEx.match_ascii_special_char, examples)
         """
-        return (
-            True
-            if re.match(
-                "[\x21-\x2F\x3A-\x40\x5B-\x60\x7B-\x7E]+",
-                str(context),
-            )
-            else False
-        )
+        return _PATTERNS["ascii_special_char"].match(_text(context)) is not None
+
+    @staticmethod
+    def kinds() -> list:
+        """
+        validate_many支持的格式名称(match_*去掉前缀, 以及weak_pwd、date_validator)
+        Returns:
+        Examples:
+            >>> RegEx.kinds()
+        """
+        names = [name[len("match_"):] for name in vars(RegEx) if name.startswith("match_")]
+        return names + ["weak_pwd", "date_validator"]
+
+    @staticmethod
+    def validate_many(kind: str, values, processes=None, chunk_size=_PROCESS_CHUNK_SIZE, as_numpy=None, **options):
+        """
+        批量效验, 结果与逐个调用对应的方法一致
+        Args:
+            kind: 格式名称, 如email/mobile, 也可以写成match_email
+            values: 需要效验的值
+            processes: 进程数, None/0/1时在当前进程中处理; 数量不超过chunk_size时同样不拆分
+            chunk_size: 每个子进程任务包含的数量
+            as_numpy: 是否返回numpy的bool数组, None时安装了numpy就返回numpy数组
+            **options: 传给对应方法的参数, 如min_length、max_length、method
+        Returns:
+            bytearray(每个值对应1/0)或numpy.ndarray(dtype=bool)
+        Examples:
+            >>> RegEx.validate_many("email", ["test@163.com", "test163.com"], as_numpy=False)
+            bytearray(b'\\x01\\x00')
+            >>> RegEx.validate_many("str_length", ["12345", "1"], min_length=3, max_length=5)
+        """
+        if kind.startswith("match_"):
+            kind = kind[len("match_"):]
+        if kind not in _PATTERNS and kind not in RegEx.kinds():
+            raise ValueError("unknown kind: %s" % kind)
+        if not isinstance(values, (list, tuple)):
+            values = list(values)
+        if processes and processes > 1 and len(values) > chunk_size:
+            chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                result = bytearray().join(executor.map(_validate_chunk, repeat(kind), chunks, repeat(options)))
+        else:
+            result = _validate_chunk(kind, values, options)
+        if as_numpy or (as_numpy is None and numpy is not None):
+            return numpy.frombuffer(result, dtype=numpy.bool_)
+        return result
+
+    @staticmethod
+    def _classify_kinds(kinds):
+        if kinds is None:
+            return tuple(_CLASSIFY_RULES)
+        kinds = tuple(kind[len("match_"):] if kind.startswith("match_") else kind for kind in kinds)
+        unknown = [kind for kind in kinds if kind not in _CLASSIFY_RULES]
+        if unknown:
+            raise ValueError("unknown kind: %s" % ", ".join(unknown))
+        return kinds
+
+    @staticmethod
+    def classify(context: Any, kinds=None) -> list:
+        """
+        一次判断值符合哪些格式, 结果与逐个调用match_*一致;
+        先按长度、首字符、必须包含的字符等条件筛掉不可能匹配的格式, 只对剩下的格式执行正则
+        Args:
+            context: 需要判断的值
+            kinds: 只判断这些格式, 默认为全部不带参数的match_*格式
+        Returns:
+            list: 匹配的格式名称(match_*去掉前缀), 按kinds的顺序
+        Examples:
+            >>> RegEx.classify("test@163.com")
+            ['email', 'double_byte_str']
+            >>> RegEx.classify("19119255552", kinds=["mobile", "ipv4", "only_number"])
+            ['mobile', 'only_number']
+        """
+        return _classify_text(_text(context), _classify_plan(RegEx._classify_kinds(kinds)))
+
+    @staticmethod
+    def classify_many(values, kinds=None) -> list:
+        """
+        批量分类, 每个值的结果同classify
+        Args:
+            values: 需要判断的值
+            kinds: 只判断这些格式
+        Returns:
+            list: [[格式, ...], ...]
+        Examples:
+            >>> RegEx.classify_many(["test@163.com", "127.0.0.1"])
+        """
+        plan = _classify_plan(RegEx._classify_kinds(kinds))
+        return [_classify_text(text, plan) for text in map(str, values)]
+
+    @staticmethod
+    def classify_columns(values, kinds=None, as_numpy=None) -> dict:
+        """
+        按列分类, 每个值只筛选一次, 适合统计一列数据中各格式的占比
+        Args:
+            values: 需要判断的值
+            kinds: 只判断这些格式
+            as_numpy: 是否返回numpy的bool数组, None时安装了numpy就返回numpy数组
+        Returns:
+            dict: {格式: bytearray(每个值对应1/0)或numpy.ndarray(dtype=bool)}
+        Examples:
+            >>> columns = RegEx.classify_columns(["test@163.com", "127.0.0.1", "abc"], as_numpy=False)
+            >>> columns["ipv4"]
+            bytearray(b'\x00\x01\x00')
+        """
+        kinds = RegEx._classify_kinds(kinds)
+        plan = _classify_plan(kinds)
+        if not isinstance(values, (list, tuple)):
+            values = list(values)
+        columns = {kind: bytearray(len(values)) for kind in kinds}
+        for index, text in enumerate(map(str, values)):
+            for kind in _classify_text(text, plan):
+                columns[kind][index] = 1
+        if as_numpy or (as_numpy is None and numpy is not None):
+            return {kind: numpy.frombuffer(column, dtype=numpy.bool_) for kind, column in columns.items()}
+        return columns
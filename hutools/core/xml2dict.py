@@ -1,23 +1,94 @@
 # -*- coding=utf-8
+import io
 import xml.etree.ElementTree
 
 
+def _local_name(tag):
+    """去掉命名空间前缀, {ns}data -> data"""
+    return tag.rsplit("}", 1)[-1] if tag[:1] == "{" else tag
+
+
+def _make_matcher(path):
+    """
+    根据tag或路径生成匹配函数, 参数为当前打开的节点栈
+    data: 任意层级的data节点; result/data: 父节点为result的data节点; /result/data: 从根节点开始的完整路径
+    带命名空间的写法{ns}data按完整tag匹配, 否则只比较本地名
+    """
+    absolute = path.startswith("/")
+    parts = [part for part in path.strip("/").split("/") if part]
+    size = len(parts)
+
+    def match(stack):
+        if len(stack) < size or (absolute and len(stack) != size):
+            return False
+        for part, element in zip(parts, stack[-size:]):
+            if part == "*":
+                continue
+            tag = element.tag if part[:1] == "{" else _local_name(element.tag)
+            if tag != part:
+                return False
+        return True
+
+    return match
+
+
 class Xml2Dict(dict):
 
     def __init__(self, parent_node):
         if parent_node.items():
             self.update_dict(dict(parent_node.items()))
         for element in parent_node:
-            if len(element):
-                adict = Xml2Dict(element)
-                self.update_dict({element.tag: adict})
-            elif element.items():
-                element_attrib = element.items()
-                if element.text:
-                    element_attrib.append((element.tag, element.text))
-                self.update_dict({element.tag: dict(element_attrib)})
-            else:
-                self.update_dict({element.tag: element.text})
+            self.update_dict({element.tag: Xml2Dict.convert_element(element)})
+
+    @staticmethod
+    def convert_element(element):
+        """按Xml2Dict处理子节点的规则转换单个节点: 有子节点时为Xml2Dict, 只有属性时为dict, 否则为文本"""
+        if len(element):
+            return Xml2Dict(element)
+        elif element.items():
+            element_attrib = element.items()
+            if element.text:
+                element_attrib.append((element.tag, element.text))
+            return dict(element_attrib)
+        return element.text
+
+    @staticmethod
+    def iterparse(source, path):
+        """
+        流式解析大型xml, 每匹配到一个节点产出一条记录, 已处理的节点会被立即清理, 内存占用与文件大小无关
+        Args:
+            source: 文件路径、文件对象或xml字符串/bytes
+            path: 节点tag或路径, 如data、result/data、/result/data、{ns}data
+
+        Returns:
+            生成器, 每条记录与Xml2Dict(父节点)[tag]中对应元素的结构一致
+
+        Examples:
+            >>> for record in Xml2Dict.iterparse("export.xml", "data"):
+            ...     print(record["id"])
+        """
+        if isinstance(source, bytes) or (isinstance(source, str) and source.lstrip()[:1] == "<"):
+            source = io.BytesIO(source.encode("utf-8") if isinstance(source, str) else source)
+        match = _make_matcher(path)
+        stack = []
+        match_depth = None
+        for event, element in xml.etree.ElementTree.iterparse(source, events=("start", "end")):
+            if event == "start":
+                stack.append(element)
+                if match_depth is None and match(stack):
+                    match_depth = len(stack)
+                continue
+
+            depth = len(stack)
+            stack.pop()
+            if match_depth is not None:
+                if depth != match_depth:
+                    continue
+                match_depth = None
+                yield Xml2Dict.convert_element(element)
+            element.clear()
+            if stack:
+                stack[-1].remove(element)
 
     def update_dict(self, adict):
         for key in adict:
@@ -9,4 +9,9 @@
 @License :  (C)Copyright 2022-2026
 @Desc    :  None
 """
-from .crypto import BaseProvider, AESProvider, RSAProvider, AESCTRCipher, DataDecryptAdapter, DataEncryptAdapter
+from .crypto import BaseProvider, AESProvider, RSAProvider, AESCTRCipher, DataDecryptAdapter, DataEncryptAdapter, \
+    AsyncDataDecryptAdapter, ProviderFactory, clear_key_cache
+from .asyncstreambody import AsyncStreamBody
+from .digest import StreamDigest, DigestReader, DigestEngine
+from .envelope import BatchEnvelopeEncryptor, BatchEnvelopeDecryptor, EnvelopeKey
+from .downloader import RangeDownloader, DownloadCheckpoint
@@ -0,0 +1,195 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  asyncstreambody.py
+@Time    :  2026/10/19 6:20 PM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  StreamBody的asyncio版本, 支持httpx/aiohttp的响应对象
+"""
+import asyncio
+import os
+import uuid
+
+__all__ = ["AsyncStreamBody"]
+
+_EOF = object()
+
+
+class AsyncStreamBody(object):
+    """
+    异步流式响应体, 后台任务读取响应写入有界队列, 队列满时暂停读取socket, 实现背压
+    Examples:
+        >>> async with httpx.AsyncClient() as client:
+        ...     async with client.stream("GET", url) as rt:
+        ...         body = AsyncStreamBody(rt, chunk_size=256 * 1024)
+        ...         async for chunk in body:
+        ...             handle(chunk)
+        >>> await AsyncStreamBody(rt).astream_to_file("local.file")
+    """
+
+    def __init__(self, rt, chunk_size=64 * 1024, max_buffer=16, auto_decompress=False):
+        """初始化
+        :param rt: httpx.Response(stream模式)或aiohttp.ClientResponse
+        :param chunk_size(int): 每次从响应中读取的块大小
+        :param max_buffer(int): 最多缓冲的块数, 缓冲区满时暂停从网络读取
+        :param auto_decompress(bool): 是否自动解压Content-Encoding
+        """
+        self._rt = rt
+        self._chunk_size = chunk_size
+        self._max_buffer = max_buffer
+        self._auto_decompress = auto_decompress
+        self._read_len = 0
+        self._recv_len = 0
+        self._content_len = 0
+        self._use_chunked = False
+        self._use_encoding = False
+        # 源迭代器产出的是否为解压后的数据, 此时收到的字节数与Content-Length不可比较
+        self._decoded = False
+        self._queue = None
+        self._producer = None
+        self._pending = b''
+        self._eof = False
+        headers = rt.headers
+        if 'Content-Length' in headers:
+            self._content_len = int(headers['Content-Length'])
+        elif 'Transfer-Encoding' in headers and headers['Transfer-Encoding'] == "chunked":
+            self._use_chunked = True
+        else:
+            raise IOError("create AsyncStreamBody failed without Content-Length header or Transfer-Encoding header")
+
+        if 'Content-Encoding' in headers:
+            self._use_encoding = True
+
+    def __len__(self):
+        return self._content_len
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    def _iter_source(self):
+        """根据响应对象的类型选择原始的异步迭代器"""
+        if hasattr(self._rt, 'aiter_raw'):
+            if self._use_encoding and not self._auto_decompress:
+                return self._rt.aiter_raw(self._chunk_size)
+            self._decoded = self._use_encoding
+            return self._rt.aiter_bytes(self._chunk_size)
+        if hasattr(self._rt, 'content') and hasattr(self._rt.content, 'iter_chunked'):
+            # aiohttp是否解压由ClientSession(auto_decompress=...)决定, 无法从响应上区分, 一律不比较长度
+            self._decoded = self._use_encoding
+            return self._rt.content.iter_chunked(self._chunk_size)
+        raise IOError("unsupported async response type: %s" % type(self._rt).__name__)
+
+    def _transform(self, chunk):
+        """对读取到的块做处理, 子类可覆盖(如解密)"""
+        return chunk
+
+    async def _produce(self):
+        try:
+            async for chunk in self._iter_source():
+                if chunk:
+                    self._recv_len += len(chunk)
+                    chunk = self._transform(chunk)
+                    if chunk:
+                        await self._queue.put(chunk)
+            await self._queue.put(_EOF)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._queue.put(e)
+
+    async def _next_chunk(self):
+        """从缓冲队列中取下一个块, 读完时返回b''"""
+        if self._eof:
+            return b''
+        if self._producer is None:
+            self._queue = asyncio.Queue(maxsize=self._max_buffer)
+            self._producer = asyncio.ensure_future(self._produce())
+        chunk = await self._queue.get()
+        if chunk is _EOF:
+            self._eof = True
+            return b''
+        if isinstance(chunk, Exception):
+            self._eof = True
+            raise chunk
+        return chunk
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._pending:
+            chunk, self._pending = self._pending, b''
+        else:
+            chunk = await self._next_chunk()
+        if not chunk:
+            raise StopAsyncIteration
+        self._read_len += len(chunk)
+        return chunk
+
+    async def aread(self, n=-1):
+        """
+        读取最多n个字节, n<0时读取全部, 读完时返回b''
+        Args:
+            n: 读取的字节数
+
+        Returns:
+
+        """
+        parts = []
+        size = 0
+        if self._pending:
+            parts.append(self._pending)
+            size = len(self._pending)
+            self._pending = b''
+        while n < 0 or size < n:
+            chunk = await self._next_chunk()
+            if not chunk:
+                break
+            parts.append(chunk)
+            size += len(chunk)
+        data = b''.join(parts)
+        if 0 <= n < len(data):
+            data, self._pending = data[:n], data[n:]
+        self._read_len += len(data)
+        return data
+
+    async def astream_to_file(self, file_name):
+        """保存流到本地文件, 写文件放在线程池中执行, 不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        tmp_file_name = "{file_name}_{uuid}".format(file_name=file_name, uuid=uuid.uuid4().hex)
+        fp = await loop.run_in_executor(None, open, tmp_file_name, 'wb')
+        try:
+            async for chunk in self:
+                await loop.run_in_executor(None, fp.write, chunk)
+        except BaseException:
+            fp.close()
+            os.remove(tmp_file_name)
+            raise
+        fp.close()
+
+        if not self._use_chunked and not self._decoded and self._recv_len != self._content_len:
+            if os.path.exists(tmp_file_name):
+                os.remove(tmp_file_name)
+            raise IOError("download failed with incomplete file")
+        if os.path.exists(file_name):
+            os.remove(file_name)
+        os.rename(tmp_file_name, file_name)
+
+    async def aclose(self):
+        """停止后台读取并关闭响应"""
+        if self._producer is not None and not self._producer.done():
+            self._producer.cancel()
+            try:
+                await self._producer
+            except asyncio.CancelledError:
+                pass
+        if hasattr(self._rt, 'aclose'):
+            await self._rt.aclose()
+        elif hasattr(self._rt, 'release'):
+            self._rt.release()
@@ -12,10 +12,13 @@
 
 import base64
 import copy
+import hashlib
 import logging
 import os
 import struct
+import threading
 from abc import abstractmethod
+from collections import OrderedDict
 
 from Crypto import Random
 from Crypto.Cipher import AES
@@ -24,13 +27,22 @@ from Crypto.PublicKey import RSA
 from Crypto.Util import Counter
 from six import text_type
 
+from .asyncstreambody import AsyncStreamBody
+from .digest import StreamDigest
 from .streambody import StreamBody
 
 logger = logging.getLogger(__name__)
 
 _AES_CTR_COUNTER_BITS_LENGTH = 8 * 16
 _AES_256_KEY_SIZE = 32
-__all__ = ["BaseProvider", "AESProvider", "RSAProvider", "AESCTRCipher", "DataDecryptAdapter", "DataEncryptAdapter"]
+__all__ = ["BaseProvider", "AESProvider", "RSAProvider", "AESCTRCipher", "DataDecryptAdapter", "DataEncryptAdapter",
+           "AsyncDataDecryptAdapter", "ProviderFactory", "clear_key_cache"]
+
+# 进程级的主密钥缓存(LRU), 避免每次创建Provider都重新读取并解析PEM;
+# 缓存键中不保存密钥内容和口令本身, 只保存其摘要
+_KEY_CACHE = OrderedDict()
+_KEY_CACHE_SIZE = 64
+_KEY_CACHE_LOCK = threading.Lock()
 
 
 def to_bytes(str_):
@@ -86,6 +98,108 @@ def iv_to_big_int(iv):
     return iv_int
 
 
+def _get_cached_key(cache_key, loader, stamp=None):
+    """
+    从缓存中获取密钥, 不存在或stamp不一致时调用loader加载并替换原有的条目
+    Args:
+        cache_key: 缓存键
+        loader: 加载函数
+        stamp: 条目的校验值, 如文件的mtime/size
+
+    Returns:
+
+    """
+    with _KEY_CACHE_LOCK:
+        entry = _KEY_CACHE.get(cache_key)
+        if entry is not None and entry[0] == stamp:
+            _KEY_CACHE.move_to_end(cache_key)
+            return entry[1]
+    key = loader()
+    with _KEY_CACHE_LOCK:
+        _KEY_CACHE[cache_key] = (stamp, key)
+        _KEY_CACHE.move_to_end(cache_key)
+        while len(_KEY_CACHE) > _KEY_CACHE_SIZE:
+            _KEY_CACHE.popitem(last=False)
+    return key
+
+
+def _secret_digest(*parts):
+    """密钥内容/口令的摘要, 用作缓存键, 各部分带长度前缀, None与空字符串区分开"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            digest.update(b"\xff")
+        else:
+            part = to_bytes(part)
+            digest.update(struct.pack(">Q", len(part)))
+            digest.update(part)
+    return digest.digest()
+
+
+def _file_stamp(path, passphrase=None):
+    """文件类密钥的校验值, 文件被替换或修改后(mtime/size变化)条目被替换"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size, _secret_digest(passphrase)
+
+
+def import_rsa_key(extern_key, passphrase=None):
+    """
+    解析PEM/DER格式的RSA密钥, 相同的密钥内容只解析一次
+    Args:
+        extern_key: 密钥内容
+        passphrase: 密钥口令
+
+    Returns:
+
+    """
+    extern_key = to_bytes(extern_key)
+    return _get_cached_key(("rsa", _secret_digest(extern_key, passphrase)),
+                           lambda: RSA.importKey(extern_key, passphrase=passphrase))
+
+
+def load_rsa_key(path, passphrase=None):
+    """
+    从文件加载RSA密钥, 每个路径只保留一个条目, mtime/size/口令变化时重新加载
+    Args:
+        path: 密钥文件路径
+        passphrase: 密钥口令
+
+    Returns:
+
+    """
+
+    def loader():
+        with open(path, 'rb') as f:
+            return RSA.importKey(f.read(), passphrase=passphrase)
+
+    path = os.path.abspath(path)
+    return _get_cached_key(("rsa_path", path), loader, _file_stamp(path, passphrase))
+
+
+def load_aes_key(path):
+    """
+    从文件加载base64编码的AES密钥, 每个路径只保留一个条目, mtime/size变化时重新加载
+    Args:
+        path: 密钥文件路径
+
+    Returns:
+
+    """
+
+    def loader():
+        with open(path, 'rb') as f:
+            return to_bytes(base64.b64decode(to_bytes(f.read())))
+
+    path = os.path.abspath(path)
+    return _get_cached_key(("aes_path", path), loader, _file_stamp(path))
+
+
+def clear_key_cache():
+    """清空进程级的密钥缓存"""
+    with _KEY_CACHE_LOCK:
+        _KEY_CACHE.clear()
+
+
 class CryptoException(Exception):
     def __init__(self, message):
         self._message = message
@@ -233,28 +347,70 @@ class BaseProvider(object):
         """根据密钥初始化cipher"""
         pass
 
+    @abstractmethod
+    def wrap_data_key(self, data_key, data_iv):
+        """使用主密钥加密数据密钥和初始随机值"""
+        pass
+
+    @abstractmethod
+    def unwrap_data_key(self, encrypt_key, encrypt_iv):
+        """使用主密钥解密数据密钥和初始随机值"""
+        pass
+
     def adjust_read_offset(self, start):
         """用于调整读取的offset为block_size对齐"""
         return self.data_cipher.adjust_read_offset(start)
 
-    def make_data_encrypt_adapter(self, stream):
-        """创建数据流加密适配器"""
-        size = 0
+    @staticmethod
+    def get_stream_size(stream):
+        """获取数据流的长度, 无法获取时返回None"""
         if hasattr(stream, '__len__'):
-            size = len(stream)
+            return len(stream)
         elif hasattr(stream, 'tell') and hasattr(stream, 'seek'):
             current = stream.tell()
             stream.seek(0, os.SEEK_END)
             size = stream.tell()
             stream.seek(current, os.SEEK_SET)
-        else:
+            return size
+        return None
+
+    def make_data_encrypt_adapter(self, stream):
+        """创建数据流加密适配器"""
+        size = self.get_stream_size(stream)
+        if size is None:
             return None
         return DataEncryptAdapter(stream, size, copy.copy(self.data_cipher))
 
+    def make_digest_encrypt_adapter(self, stream, algorithms=("md5", "crc64")):
+        """
+        创建边加密边计算摘要的适配器, 明文和密文的摘要在同一次读取中完成, 无需预先调用DataHand.get_content_md5
+        Args:
+            stream: 需要加密的数据流
+            algorithms: 摘要算法, 支持md5/sha1/sha256/crc64等
+
+        Returns:
+            DataEncryptAdapter: 读取完毕后通过plain_digest和cipher_digest获取明文和密文的摘要
+
+        Examples:
+            >>> adapter = provider.make_digest_encrypt_adapter(open("local.file", "rb"))
+            >>> body = adapter.read(-1)
+            >>> adapter.plain_digest.b64digest("md5"), adapter.cipher_digest.hexdigest("crc64")
+        """
+        size = self.get_stream_size(stream)
+        if size is None:
+            return None
+        return DataEncryptAdapter(stream, size, copy.copy(self.data_cipher),
+                                  plain_digest=StreamDigest(algorithms),
+                                  cipher_digest=StreamDigest(algorithms))
+
     def make_data_decrypt_adapter(self, rt, offset):
         """创建数据流解密适配器"""
         return DataDecryptAdapter(rt, copy.copy(self.data_cipher), offset)
 
+    def make_async_data_decrypt_adapter(self, rt, offset=0, **kwargs):
+        """创建异步数据流解密适配器, kwargs透传给AsyncStreamBody(chunk_size/max_buffer)"""
+        return AsyncDataDecryptAdapter(rt, copy.copy(self.data_cipher), offset, **kwargs)
+
 
 class RSAProvider(BaseProvider):
     """客户端非对称主密钥加密类"""
@@ -272,8 +428,8 @@ class RSAProvider(BaseProvider):
         self.__data_iv = None
 
         if isinstance(key_pair_info, RSAKeyPair):
-            self.__encrypt_obj = PKCS1_v1_5.new(RSA.importKey(key_pair_info.public_key, passphrase=passphrase))
-            self.__decrypt_obj = PKCS1_v1_5.new(RSA.importKey(key_pair_info.private_key, passphrase=passphrase))
+            self.__encrypt_obj = PKCS1_v1_5.new(import_rsa_key(key_pair_info.public_key, passphrase=passphrase))
+            self.__decrypt_obj = PKCS1_v1_5.new(import_rsa_key(key_pair_info.private_key, passphrase=passphrase))
         elif isinstance(key_pair_info, RSAKeyPairPath):
             self.__encrypt_obj, self.__decrypt_obj = self.__get_key_by_path(key_pair_info.public_key_path,
                                                                             key_pair_info.private_key_path, passphrase)
@@ -323,11 +479,8 @@ class RSAProvider(BaseProvider):
         encrypt_obj, decrypt_obj = None, None
 
         if os.path.exists(public_path) and os.path.exists(private_path):
-            with open(public_path, 'rb') as f:
-                encrypt_obj = PKCS1_OAEP.new(RSA.importKey(f.read(), passphrase=passphrase))
-
-            with open(private_path, 'rb') as f:
-                decrypt_obj = PKCS1_OAEP.new(RSA.importKey(f.read(), passphrase=passphrase))
+            encrypt_obj = PKCS1_OAEP.new(load_rsa_key(public_path, passphrase=passphrase))
+            decrypt_obj = PKCS1_OAEP.new(load_rsa_key(private_path, passphrase=passphrase))
 
         return encrypt_obj, decrypt_obj
 
@@ -337,17 +490,22 @@ class RSAProvider(BaseProvider):
         self.__data_iv = self.data_cipher.get_counter_iv()
         start = iv_to_big_int(self.__data_iv)
         self.data_cipher.new_cipher(self.__data_key, start)
-        encrypt_key = self.__encrypt_obj.encrypt(self.__data_key)
-        encrypt_iv = self.__encrypt_obj.encrypt(self.__data_iv)
-        return encrypt_key, encrypt_iv
+        return self.wrap_data_key(self.__data_key, self.__data_iv)
 
     def init_data_cipher_by_user(self, encrypt_key, encrypt_iv, offset=0):
         """根据密钥初始化cipher"""
-        self.__data_key = self.__decrypt_obj.decrypt(encrypt_key)
-        self.__data_iv = self.__decrypt_obj.decrypt(encrypt_iv)
+        self.__data_key, self.__data_iv = self.unwrap_data_key(encrypt_key, encrypt_iv)
         start = iv_to_big_int(self.__data_iv)
         self.data_cipher.new_cipher(self.__data_key, start, offset)
 
+    def wrap_data_key(self, data_key, data_iv):
+        """使用RSA公钥加密数据密钥和初始随机值"""
+        return self.__encrypt_obj.encrypt(data_key), self.__encrypt_obj.encrypt(data_iv)
+
+    def unwrap_data_key(self, encrypt_key, encrypt_iv):
+        """使用RSA私钥解密数据密钥和初始随机值"""
+        return self.__decrypt_obj.decrypt(encrypt_key), self.__decrypt_obj.decrypt(encrypt_iv)
+
 
 class AESProvider(BaseProvider):
     """客户端对称主密钥加密类"""
@@ -370,17 +528,13 @@ class AESProvider(BaseProvider):
             self.__ed_obj = AES.new(aes_key, AES.MODE_CTR, counter=self.__my_counter)
         elif self.__aes_key_path:
             if os.path.exists(self.__aes_key_path):
-                with open(self.__aes_key_path, 'rb') as f:
-                    aes_key = f.read()
-                    aes_key = to_bytes(base64.b64decode(to_bytes(aes_key)))
-                    self.__ed_obj = AES.new(aes_key, AES.MODE_CTR, counter=self.__my_counter)
+                aes_key = load_aes_key(self.__aes_key_path)
+                self.__ed_obj = AES.new(aes_key, AES.MODE_CTR, counter=self.__my_counter)
         else:
             logger.info('aes_key and aes_key_path is None, try to get key from default path')
             if os.path.exists(default_key_path):
-                with open(default_key_path, 'rb') as f:
-                    aes_key = f.read()
-                    aes_key = to_bytes(base64.b64decode(to_bytes(aes_key)))
-                    self.__ed_obj = AES.new(aes_key, AES.MODE_CTR, counter=self.__my_counter)
+                aes_key = load_aes_key(default_key_path)
+                self.__ed_obj = AES.new(aes_key, AES.MODE_CTR, counter=self.__my_counter)
 
         if self.__ed_obj is None:
             logger.warn('fail to get aes key, will generate key')
@@ -399,29 +553,73 @@ class AESProvider(BaseProvider):
         self.__data_iv = self.data_cipher.get_counter_iv()
         start = iv_to_big_int(self.__data_iv)
         self.data_cipher.new_cipher(self.__data_key, start)
-
-        self.init_ed_obj()
-        encrypt_key = self.__ed_obj.encrypt(self.__data_key)
-        encrypt_iv = self.__ed_obj.encrypt(self.__data_iv)
-        return encrypt_key, encrypt_iv
+        return self.wrap_data_key(self.__data_key, self.__data_iv)
 
     def init_data_cipher_by_user(self, encrypt_key, encrypt_iv, offset=0):
         """根据密钥初始化cipher"""
-        self.init_ed_obj()
-        self.__data_key = self.__ed_obj.decrypt(encrypt_key)
-        self.__data_iv = self.__ed_obj.decrypt(encrypt_iv)
+        self.__data_key, self.__data_iv = self.unwrap_data_key(encrypt_key, encrypt_iv)
         start = iv_to_big_int(self.__data_iv)
         self.data_cipher.new_cipher(self.__data_key, start, offset)
 
+    def wrap_data_key(self, data_key, data_iv):
+        """使用AES主密钥加密数据密钥和初始随机值"""
+        self.init_ed_obj()
+        return self.__ed_obj.encrypt(data_key), self.__ed_obj.encrypt(data_iv)
+
+    def unwrap_data_key(self, encrypt_key, encrypt_iv):
+        """使用AES主密钥解密数据密钥和初始随机值"""
+        self.init_ed_obj()
+        return self.__ed_obj.decrypt(encrypt_key), self.__ed_obj.decrypt(encrypt_iv)
+
+
+class ProviderFactory(object):
+    """
+    可复用的Provider工厂, 主密钥只在首次创建时读取解析, 之后每次create仅构造独立的数据cipher,
+    封装数据密钥的开销只剩RSA/AES运算本身
+    Examples:
+        >>> factory = ProviderFactory.rsa(RSAProvider.get_rsa_key_pair_path("pub.pem", "pri.pem"))
+        >>> provider = factory.create()
+        >>> encrypt_key, encrypt_iv = provider.init_data_cipher()
+    """
+
+    def __init__(self, provider_cls, **kwargs):
+        """初始化
+        :param provider_cls: RSAProvider/AESProvider
+        :param kwargs: 传给provider_cls的参数(cipher除外)
+        """
+        self._provider_cls = provider_cls
+        self._kwargs = kwargs
+
+    @classmethod
+    def rsa(cls, key_pair_info=None, passphrase=None):
+        return cls(RSAProvider, key_pair_info=key_pair_info, passphrase=passphrase)
+
+    @classmethod
+    def aes(cls, aes_key=None, aes_key_path=None):
+        return cls(AESProvider, aes_key=aes_key, aes_key_path=aes_key_path)
+
+    def create(self):
+        """创建Provider, 每个Provider持有独立的AESCTRCipher, 可在不同线程中并发使用"""
+        return self._provider_cls(cipher=AESCTRCipher(), **self._kwargs)
+
 
 class DataEncryptAdapter(object):
     """用于读取经过加密后的的数据"""
 
-    def __init__(self, data, content_len, data_cipher):
+    def __init__(self, data, content_len, data_cipher, plain_digest=None, cipher_digest=None):
+        """初始化
+        :param data: 需要加密的bytes/str或文件对象
+        :param content_len(int): 需要加密的数据长度
+        :param data_cipher(an AES object): 数据加解密类
+        :param plain_digest(StreamDigest): 可选, 读取时同步计算明文摘要
+        :param cipher_digest(StreamDigest): 可选, 读取时同步计算密文摘要
+        """
         self._data = to_bytes(data)
         self._data_cipher = data_cipher
         self._content_len = content_len
         self._read_len = 0
+        self.plain_digest = plain_digest
+        self.cipher_digest = cipher_digest
 
     @property
     def len(self):
@@ -443,7 +641,11 @@ class DataEncryptAdapter(object):
             content = self._data.read(bytes_to_read)
 
         self._read_len += bytes_to_read
+        if self.plain_digest is not None:
+            self.plain_digest.update(content)
         content = self._data_cipher.encrypt(content)
+        if self.cipher_digest is not None:
+            self.cipher_digest.update(content)
         return content
 
 
@@ -478,3 +680,27 @@ class DataDecryptAdapter(StreamBody):
             content = content[self._offset:]
             self._read_len = self._offset
         return content
+
+
+class AsyncDataDecryptAdapter(AsyncStreamBody):
+    """用于异步读取经过解密后的数据"""
+
+    def __init__(self, rt, data_cipher, offset=0, **kwargs):
+        """初始化
+        :param rt: httpx/aiohttp的响应对象
+        :param data_cipher(an AES object): 数据加解密类
+        :param offset(int): 解密后需要跳过的字节数
+        :param kwargs: chunk_size/max_buffer等参数
+        """
+        super(AsyncDataDecryptAdapter, self).__init__(rt, **kwargs)
+        self._data_cipher = data_cipher
+        self._offset = offset
+
+    def _transform(self, chunk):
+        """解密在后台读取任务中完成, 消费端拿到的就是明文"""
+        content = self._data_cipher.decrypt(chunk)
+        if self._offset:
+            skip = min(self._offset, len(content))
+            content = content[skip:]
+            self._offset -= skip
+        return content
@@ -0,0 +1,288 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  digest.py
+@Time    :  2026/10/19 10:12 AM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  流式摘要计算(MD5/SHA/CRC64), 可串联在加解密流水线中
+"""
+import base64
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import crcmod
+from six import text_type
+
+__all__ = ["StreamDigest", "DigestReader", "DigestEngine", "new_hasher"]
+
+# CRC64-ECMA182, 与对象存储服务端x-cos-hash-crc64ecma的算法一致
+_CRC64_POLY = 0x142F0E1EBA9EA3693
+_CRC64_XOR_OUT = 0xffffffffffffffff
+CRC64 = "crc64"
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+def new_hasher(name):
+    """
+    根据算法名创建摘要对象
+    Args:
+        name: md5/sha1/sha256/crc64 以及hashlib支持的其它算法
+
+    Returns:
+
+    """
+    if name == CRC64:
+        return crcmod.Crc(_CRC64_POLY, initCrc=0, xorOut=_CRC64_XOR_OUT, rev=True)
+    return hashlib.new(name)
+
+
+class StreamDigest(object):
+    """同时维护多个摘要算法的状态, 每个数据块只需update一次"""
+
+    def __init__(self, algorithms=("md5",)):
+        """初始化
+        :param algorithms(tuple): 需要计算的摘要算法
+        """
+        self._hashers = {name: new_hasher(name) for name in algorithms}
+        self.length = 0
+
+    @property
+    def algorithms(self):
+        return tuple(self._hashers)
+
+    def update(self, data):
+        """更新所有摘要"""
+        if not data:
+            return
+        if isinstance(data, text_type):
+            data = data.encode('utf-8')
+        for hasher in self._hashers.values():
+            hasher.update(data)
+        self.length += len(data)
+
+    def digest(self, name):
+        """原始摘要值, crc64为8字节大端序"""
+        hasher = self._hashers[name]
+        if name == CRC64:
+            return struct.pack(">Q", hasher.crcValue)
+        return hasher.digest()
+
+    def hexdigest(self, name):
+        """十六进制摘要值, crc64为十进制字符串(与服务端返回的格式一致)"""
+        hasher = self._hashers[name]
+        if name == CRC64:
+            return str(hasher.crcValue)
+        return hasher.hexdigest()
+
+    def b64digest(self, name):
+        """base64摘要值, 与DataHand.get_content_md5的返回格式一致"""
+        return base64.standard_b64encode(self.digest(name))
+
+    def result(self):
+        """
+        汇总所有摘要
+        Returns:
+            dict: {算法名: hexdigest}
+        """
+        return {name: self.hexdigest(name) for name in self._hashers}
+
+    def copy(self):
+        other = StreamDigest(())
+        other._hashers = {name: hasher.copy() for name, hasher in self._hashers.items()}
+        other.length = self.length
+        return other
+
+
+class DigestReader(object):
+    """
+    可组合的流式摘要阶段, 读取上游数据的同时计算摘要, 数据只读取一次
+    Examples:
+        >>> reader = DigestReader(open("local.file", "rb"), algorithms=("md5", "crc64"))
+        >>> while reader.read(1024 * 1024):
+        ...     pass
+        >>> reader.digest.result()
+    """
+
+    def __init__(self, stream, algorithms=("md5",), digest=None):
+        """初始化
+        :param stream: bytes/str 或带有read方法的对象
+        :param algorithms(tuple): 需要计算的摘要算法, digest不为空时忽略
+        :param digest(StreamDigest): 复用已有的摘要对象
+        """
+        if isinstance(stream, text_type):
+            stream = stream.encode('utf-8')
+        self._stream = stream
+        self._offset = 0
+        self.digest = digest if digest is not None else StreamDigest(algorithms)
+
+    @property
+    def len(self):
+        if isinstance(self._stream, bytes):
+            return len(self._stream)
+        if hasattr(self._stream, 'len'):
+            return self._stream.len
+        if hasattr(self._stream, '__len__'):
+            return len(self._stream)
+        return None
+
+    def read(self, length=-1):
+        """读取数据并更新摘要"""
+        if isinstance(self._stream, bytes):
+            if length is None or length < 0:
+                end = len(self._stream)
+            else:
+                end = min(self._offset + length, len(self._stream))
+            content = self._stream[self._offset:end]
+            self._offset = end
+        else:
+            content = self._stream.read(length)
+        self.digest.update(content)
+        return content
+
+
+class DigestEngine(object):
+    """
+    批量并发计算文件摘要, 每个线程复用同一块缓冲区readinto读取(或mmap), hashlib在计算大块数据时会释放GIL
+    Examples:
+        >>> engine = DigestEngine(algorithms=("md5", "crc64"), max_workers=8)
+        >>> [digest.b64digest("md5") for digest in engine.digest_files(["a.bin", "b.bin"])]
+        >>> engine.multipart_etag("big.bin", part_size=8 * 1024 * 1024)
+    """
+
+    def __init__(self, algorithms=("md5",), max_workers=None, buffer_size=DEFAULT_BUFFER_SIZE, use_mmap=False):
+        """初始化
+        :param algorithms(tuple): 需要计算的摘要算法
+        :param max_workers(int): 线程数, 默认与ThreadPoolExecutor一致
+        :param buffer_size(int): 每次读取的块大小
+        :param use_mmap(bool): 对文件路径使用mmap代替readinto
+        """
+        self.algorithms = tuple(algorithms)
+        self.max_workers = max_workers
+        self.buffer_size = buffer_size
+        self.use_mmap = use_mmap
+        self._local = threading.local()
+
+    def _get_buffer(self):
+        """线程内复用的读缓冲区"""
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = memoryview(bytearray(self.buffer_size))
+        return buffer
+
+    def _update_from_file(self, digest, fp, length):
+        buffer = self._get_buffer()
+        readinto = getattr(fp, 'readinto', None)
+        remaining = length
+        while remaining is None or remaining > 0:
+            size = self.buffer_size if remaining is None else min(self.buffer_size, remaining)
+            if readinto is not None:
+                read_len = readinto(buffer[:size])
+                if not read_len:
+                    break
+                digest.update(buffer[:read_len])
+            else:
+                chunk = fp.read(size)
+                if not chunk:
+                    break
+                read_len = len(chunk)
+                digest.update(chunk)
+            if remaining is not None:
+                remaining -= read_len
+
+    def _update_from_mmap(self, digest, path, start, length):
+        if os.path.getsize(path) == 0:
+            return
+        with open(path, 'rb') as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            end = len(mapped) if length is None else min(len(mapped), start + length)
+            view = memoryview(mapped)
+            try:
+                for offset in range(start, end, self.buffer_size):
+                    digest.update(view[offset:min(offset + self.buffer_size, end)])
+            finally:
+                view.release()
+
+    def digest_file(self, source, start=0, length=None):
+        """
+        计算单个文件(或其中一段)的摘要
+        Args:
+            source: 文件路径或已打开的二进制文件对象(计算完成后恢复其读取位置)
+            start: 起始偏移
+            length: 读取长度, None表示读到文件末尾
+
+        Returns:
+            StreamDigest
+        """
+        digest = StreamDigest(self.algorithms)
+        if isinstance(source, (str, bytes, os.PathLike)):
+            if self.use_mmap:
+                self._update_from_mmap(digest, source, start, length)
+            else:
+                with open(source, 'rb', buffering=0) as fp:
+                    fp.seek(start)
+                    self._update_from_file(digest, fp, length)
+            return digest
+
+        file_position = source.tell()
+        try:
+            source.seek(start)
+            self._update_from_file(digest, source, length)
+        finally:
+            source.seek(file_position)
+        return digest
+
+    def digest_files(self, sources):
+        """
+        并发计算多个文件的摘要
+        Args:
+            sources: 文件路径或文件对象的列表, 同一个文件对象不能重复出现
+
+        Returns:
+            list: 与sources顺序一致的StreamDigest列表
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self.digest_file, sources))
+
+    def digest_ranges(self, source, part_size):
+        """
+        按分片大小计算每个分片的摘要, 路径会并发计算, 文件对象按顺序计算
+        Args:
+            source: 文件路径或文件对象
+            part_size: 分片大小
+
+        Returns:
+            list: 每个分片的StreamDigest
+        """
+        if isinstance(source, (str, bytes, os.PathLike)):
+            size = os.path.getsize(source)
+            starts = list(range(0, size, part_size)) or [0]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                return list(executor.map(lambda start: self.digest_file(source, start, part_size), starts))
+
+        file_position = source.tell()
+        source.seek(0, os.SEEK_END)
+        size = source.tell()
+        source.seek(file_position)
+        return [self.digest_file(source, start, part_size) for start in range(0, size, part_size) or [0]]
+
+    def multipart_etag(self, source, part_size):
+        """
+        计算分块上传的ETag: md5(各分片md5拼接)-分片数
+        Args:
+            source: 文件路径或文件对象
+            part_size: 分片大小
+
+        Returns:
+            str: 带双引号的ETag, 与DataHand.get_raw_md5的格式一致
+        """
+        engine = self if "md5" in self.algorithms else DigestEngine(("md5",), self.max_workers, self.buffer_size,
+                                                                  self.use_mmap)
+        parts = engine.digest_ranges(source, part_size)
+        combined = hashlib.md5(b"".join(part.digest("md5") for part in parts))
+        return '"%s-%d"' % (combined.hexdigest(), len(parts))
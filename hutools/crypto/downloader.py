@@ -0,0 +1,339 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  downloader.py
+@Time    :  2026/10/19 4:05 PM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  基于StreamBody的多连接分片并发下载
+"""
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .crypto import AESCTRCipher, DataDecryptAdapter, iv_to_big_int
+from .digest import CRC64, StreamDigest
+from .streambody import StreamBody
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["RangeDownloader", "DownloadCheckpoint"]
+
+_CONTENT_RANGE_PATTERN = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+)")
+_MIN_PART_SIZE = 1024 * 1024
+# 分片边界需要按AES block对齐, 否则无法从分片起始位置开始解密
+_PART_ALIGN = 16
+
+
+class _DigestWriter(object):
+    """写入文件的同时计算摘要, 用于记录已完成分片的校验值"""
+
+    def __init__(self, fdst, digest):
+        self._fdst = fdst
+        self.digest = digest
+
+    def seek(self, offset, whence=0):
+        return self._fdst.seek(offset, whence)
+
+    def write(self, data):
+        self.digest.update(data)
+        return self._fdst.write(data)
+
+
+class DownloadCheckpoint(object):
+    """
+    断点续传的检查点文件, 记录对象长度、ETag以及已校验完成的分片
+    {"url": ..., "size": ..., "etag": ..., "ranges": [[start, end], ...], "completed": {"start": crc64}}
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.url = None
+        self.size = None
+        self.etag = None
+        self.ranges = []
+        self.completed = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """读取检查点文件, 文件不存在或已损坏时返回False"""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, 'r') as f:
+                record = json.load(f)
+            self.url = record["url"]
+            self.size = record["size"]
+            self.etag = record["etag"]
+            self.ranges = [tuple(item) for item in record["ranges"]]
+            self.completed = {int(start): crc for start, crc in record["completed"].items()}
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("ignore broken checkpoint %s: %s", self.path, e)
+            return False
+        return True
+
+    def match(self, url, size, etag, ranges):
+        """检查点是否属于同一个对象的同一次拆分"""
+        return self.url == url and self.size == size and self.etag == etag and self.ranges == list(ranges)
+
+    def reset(self, url, size, etag, ranges):
+        self.url, self.size, self.etag = url, size, etag
+        self.ranges = list(ranges)
+        self.completed = {}
+        self.save()
+
+    def mark(self, start, crc64):
+        """记录一个已完成的分片并立即落盘"""
+        with self._lock:
+            self.completed[start] = crc64
+            self.save()
+
+    def save(self):
+        """先写临时文件再替换, 避免进程中断时留下半个检查点"""
+        record = {
+            "url": self.url,
+            "size": self.size,
+            "etag": self.etag,
+            "ranges": [list(item) for item in self.ranges],
+            "completed": {str(start): crc for start, crc in self.completed.items()},
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(record, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class RangeDownloader(object):
+    """
+    将对象按字节区间拆分为多个分片, 通过连接池并发下载并写入预分配的本地文件
+    Examples:
+        >>> RangeDownloader("http://127.0.0.1:8000/big.file", num_threads=8).download("big.file")
+        边下载边解密
+        >>> RangeDownloader(url).download("big.file", provider=provider, encrypt_key=key, encrypt_iv=iv)
+        断点续传, 失败后再次调用会跳过已完成的分片
+        >>> RangeDownloader(url).download("big.file", resumable=True)
+    """
+
+    def __init__(self, url, num_threads=4, part_size=None, session=None, headers=None, timeout=30, retries=2,
+                 **request_kwargs):
+        """初始化
+        :param url(str): 对象地址, 服务端需要支持Range请求
+        :param num_threads(int): 并发连接数
+        :param part_size(int): 分片大小, 默认按并发数平均拆分(不小于1MB)
+        :param session(requests.Session): 复用已有的session, 默认创建连接池大小为num_threads的session
+        :param headers(dict): 额外的请求头
+        :param timeout(int): 请求超时时间
+        :param retries(int): 单个分片失败后的重试次数
+        :param request_kwargs: 透传给requests的其它参数
+        """
+        self.url = url
+        self.num_threads = max(1, num_threads)
+        self.part_size = part_size
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.retries = retries
+        self.request_kwargs = request_kwargs
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.num_threads)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def _request(self, method, headers=None, stream=False):
+        request_headers = dict(self.headers)
+        request_headers.update(headers or {})
+        return self.session.request(method, self.url, headers=request_headers, timeout=self.timeout,
+                                    stream=stream, **self.request_kwargs)
+
+    def get_object_info(self):
+        """
+        获取对象长度和ETag, HEAD失败时退化为Range: bytes=0-0
+        Returns:
+            tuple: (content_length, etag)
+        """
+        rt = self._request("HEAD", {"Accept-Encoding": "identity"})
+        if rt.status_code == 200 and "Content-Length" in rt.headers:
+            return int(rt.headers["Content-Length"]), rt.headers.get("ETag")
+
+        rt = self._request("GET", {"Range": "bytes=0-0", "Accept-Encoding": "identity"}, stream=True)
+        rt.close()
+        if rt.status_code == 206:
+            matched = _CONTENT_RANGE_PATTERN.match(rt.headers.get("Content-Range", ""))
+            if matched:
+                return int(matched.group(3)), rt.headers.get("ETag")
+        raise IOError("get object size failed with status code %s" % rt.status_code)
+
+    def split_ranges(self, size):
+        """
+        拆分字节区间
+        Args:
+            size: 对象长度
+
+        Returns:
+            list: [(start, end), ...] 闭区间
+        """
+        part_size = self.part_size or max(_MIN_PART_SIZE, -(-size // self.num_threads))
+        part_size = -(-part_size // _PART_ALIGN) * _PART_ALIGN
+        return [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+
+    def _new_data_cipher(self, data_key, data_iv, offset):
+        """每个分片独立的解密cipher, 从分片起始位置对应的counter开始"""
+        cipher = AESCTRCipher()
+        cipher.new_cipher(data_key, iv_to_big_int(data_iv), offset)
+        return cipher
+
+    def download_range(self, fdst, start, end, etag=None, data_key=None, data_iv=None, size=None):
+        """
+        下载单个分片并写入fdst的start偏移, fdst只需支持seek和write
+        Args:
+            size: 对象总长度, 指定时要求Content-Range与之一致
+
+        Returns:
+            int: 写入的字节数
+        """
+        headers = {"Range": "bytes=%d-%d" % (start, end), "Accept-Encoding": "identity"}
+        if etag:
+            headers["If-Match"] = etag
+        rt = self._request("GET", headers, stream=True)
+        try:
+            if rt.status_code != 206:
+                raise IOError("range request failed with status code %s" % rt.status_code)
+            content_range = rt.headers.get("Content-Range", "")
+            matched = _CONTENT_RANGE_PATTERN.match(content_range)
+            if not matched or (int(matched.group(1)), int(matched.group(2))) != (start, end) \
+                    or (size is not None and int(matched.group(3)) != size):
+                raise IOError("unexpected Content-Range %r for bytes=%d-%d/%s" % (content_range, start, end, size))
+            if data_key is not None:
+                body = DataDecryptAdapter(rt, self._new_data_cipher(data_key, data_iv, start))
+            else:
+                body = StreamBody(rt)
+            return body.pget_stream_to_file(fdst, start, end - start + 1)
+        finally:
+            rt.close()
+
+    def _download_part(self, file_name, start, end, etag, data_key, data_iv, checkpoint=None, size=None):
+        for attempt in range(self.retries + 1):
+            try:
+                with open(file_name, 'r+b') as fdst:
+                    if checkpoint is None:
+                        return self.download_range(fdst, start, end, etag, data_key, data_iv, size)
+                    writer = _DigestWriter(fdst, StreamDigest((CRC64,)))
+                    written = self.download_range(writer, start, end, etag, data_key, data_iv, size)
+                    checkpoint.mark(start, writer.digest.hexdigest(CRC64))
+                    return written
+            except (IOError, requests.RequestException) as e:
+                if attempt >= self.retries:
+                    raise
+                logger.warning("download range %s-%s failed: %s, retry %s", start, end, e, attempt + 1)
+
+    @staticmethod
+    def _verify_part(file_name, start, end, crc64):
+        """校验本地已下载分片的crc64"""
+        digest = StreamDigest((CRC64,))
+        remaining = end - start + 1
+        with open(file_name, 'rb') as f:
+            f.seek(start)
+            while remaining > 0:
+                chunk = f.read(min(remaining, _MIN_PART_SIZE))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                remaining -= len(chunk)
+        return remaining == 0 and digest.hexdigest(CRC64) == crc64
+
+    def _prepare_resume(self, tmp_file_name, checkpoint, size, etag, ranges, verify_resumed):
+        """加载检查点, 返回仍需下载的分片"""
+        if checkpoint.load() and checkpoint.match(self.url, size, etag, ranges) \
+                and os.path.exists(tmp_file_name) and os.path.getsize(tmp_file_name) == size:
+            pending = []
+            for start, end in ranges:
+                crc64 = checkpoint.completed.get(start)
+                if crc64 is not None and (not verify_resumed or self._verify_part(tmp_file_name, start, end, crc64)):
+                    continue
+                checkpoint.completed.pop(start, None)
+                pending.append((start, end))
+            logger.info("resume download %s, %s of %s ranges left", self.url, len(pending), len(ranges))
+            return pending
+
+        with open(tmp_file_name, 'wb') as fp:
+            fp.truncate(size)
+        checkpoint.reset(self.url, size, etag, ranges)
+        return list(ranges)
+
+    def download(self, file_name, provider=None, encrypt_key=None, encrypt_iv=None, resumable=False,
+                 checkpoint_file=None, verify_resumed=True):
+        """
+        并发下载对象到本地文件
+        Args:
+            file_name: 本地文件路径
+            provider: 可选, 客户端加密的主密钥Provider, 用于边下载边解密
+            encrypt_key: 被主密钥加密的数据密钥
+            encrypt_iv: 被主密钥加密的初始随机值
+            resumable: 是否断点续传, 失败时保留临时文件和检查点, 再次调用时只下载未完成的分片
+            checkpoint_file: 检查点文件路径, 默认为"{file_name}.cpt"
+            verify_resumed: 续传时是否先用crc64校验本地已完成的分片
+
+        Returns:
+            int: 下载的字节数
+        """
+        data_key = data_iv = None
+        if provider is not None:
+            data_key, data_iv = provider.unwrap_data_key(encrypt_key, encrypt_iv)
+
+        size, etag = self.get_object_info()
+        ranges = self.split_ranges(size)
+        checkpoint = None
+        if resumable:
+            tmp_file_name = "{file_name}.download".format(file_name=file_name)
+            checkpoint = DownloadCheckpoint(checkpoint_file or "{file_name}.cpt".format(file_name=file_name))
+            pending = self._prepare_resume(tmp_file_name, checkpoint, size, etag, ranges, verify_resumed)
+        else:
+            tmp_file_name = "{file_name}_{uuid}".format(file_name=file_name, uuid=uuid.uuid4().hex)
+            with open(tmp_file_name, 'wb') as fp:
+                fp.truncate(size)
+            pending = ranges
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.num_threads, max(1, len(pending)))) as executor:
+                futures = [executor.submit(self._download_part, tmp_file_name, start, end, etag, data_key, data_iv,
+                                           checkpoint, size)
+                           for start, end in pending]
+                # 续传时已完成的分片按区间长度计入
+                pending_set = set(pending)
+                received = sum(end - start + 1 for start, end in ranges if (start, end) not in pending_set)
+                try:
+                    for future in futures:
+                        received += future.result()
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+            if checkpoint is not None and len(checkpoint.completed) != len(ranges):
+                raise IOError("download failed with incomplete file")
+            if received != size:
+                raise IOError("download failed with incomplete file: %s of %s bytes" % (received, size))
+        except BaseException:
+            # 续传模式下保留临时文件和检查点, 下次调用时继续
+            if checkpoint is None and os.path.exists(tmp_file_name):
+                os.remove(tmp_file_name)
+            raise
+
+        if os.path.exists(file_name):
+            os.remove(file_name)
+        os.rename(tmp_file_name, file_name)
+        if checkpoint is not None:
+            checkpoint.remove()
+        return size
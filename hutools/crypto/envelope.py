@@ -0,0 +1,200 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  envelope.py
+@Time    :  2026/10/19 2:40 PM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  批量信封加密, 一个批次共用一个数据密钥, 适用于海量小对象
+"""
+import base64
+import os
+import struct
+import threading
+import time
+
+from Crypto.Cipher import AES
+
+from .crypto import CryptoException, iv_to_big_int
+
+__all__ = ["EnvelopeKey", "BatchEnvelopeEncryptor", "BatchEnvelopeDecryptor"]
+
+# 对象头: 8字节批次密钥id + 8字节对象序号
+_OBJECT_HEADER = struct.Struct(">8sQ")
+OBJECT_HEADER_SIZE = _OBJECT_HEADER.size
+# 每个对象预留的counter空间(以16字节block计), 默认单个对象最大64GB
+DEFAULT_OBJECT_BLOCKS = 1 << 32
+_COUNTER_SPACE = 1 << 128
+
+
+class EnvelopeKey(object):
+    """一个批次的数据密钥, record()为需要持久化的部分(仅包含被主密钥加密后的数据密钥)"""
+
+    def __init__(self, key_id, data_key, data_iv, encrypt_key, encrypt_iv, object_blocks=DEFAULT_OBJECT_BLOCKS):
+        self.key_id = key_id
+        self.data_key = data_key
+        self.start = iv_to_big_int(data_iv)
+        self.encrypt_key = encrypt_key
+        self.encrypt_iv = encrypt_iv
+        self.object_blocks = object_blocks
+        self.created = time.monotonic()
+        self.count = 0
+
+    def new_cipher(self, index):
+        """根据对象序号派生该对象独立的counter区间"""
+        start = (self.start + index * self.object_blocks) % _COUNTER_SPACE
+        return AES.new(self.data_key, AES.MODE_CTR, nonce=b'', initial_value=start)
+
+    def record(self):
+        """
+        批次密钥的持久化记录
+        Returns:
+            dict: key_id/encrypt_key/encrypt_iv均为base64字符串
+        """
+        return {
+            "key_id": base64.b64encode(self.key_id).decode(),
+            "encrypt_key": base64.b64encode(self.encrypt_key).decode(),
+            "encrypt_iv": base64.b64encode(self.encrypt_iv).decode(),
+            "object_blocks": self.object_blocks,
+        }
+
+
+class BatchEnvelopeEncryptor(object):
+    """
+    批量信封加密, 每个批次(或时间窗口)只调用一次主密钥加密数据密钥, 每个对象从counter空间中派生独立的IV,
+    返回16字节的对象头, 加密吞吐接近AES本身
+    Examples:
+        >>> encryptor = BatchEnvelopeEncryptor(ProviderFactory.rsa(key_pair_info).create(), on_rotate=save_record)
+        >>> header, ciphertext = encryptor.encrypt(b'{"id": 1}')
+    """
+
+    def __init__(self, provider, max_objects=1 << 20, max_age=300, object_blocks=DEFAULT_OBJECT_BLOCKS,
+                 on_rotate=None):
+        """初始化
+        :param provider(BaseProvider): 主密钥加密类, 用于加密数据密钥
+        :param max_objects(int): 单个数据密钥最多加密的对象数, 超过后轮换
+        :param max_age(int): 单个数据密钥的最长使用秒数, 超过后轮换, None表示不限制
+        :param object_blocks(int): 每个对象预留的counter block数, 决定单个对象的最大长度
+        :param on_rotate(callable): 生成新批次密钥时的回调, 参数为EnvelopeKey.record()
+        """
+        self._provider = provider
+        self._max_objects = max_objects
+        self._max_age = max_age
+        self._object_blocks = object_blocks
+        self._max_object_size = object_blocks * AES.block_size
+        self._on_rotate = on_rotate
+        self._lock = threading.Lock()
+        self._current = None
+
+    @property
+    def current_key(self):
+        return self._current
+
+    def _expired(self, key):
+        if key.count >= self._max_objects:
+            return True
+        return self._max_age is not None and time.monotonic() - key.created >= self._max_age
+
+    def rotate(self):
+        """生成新的批次数据密钥, 这是唯一需要主密钥运算的地方"""
+        data_key = self._provider.get_data_key()
+        data_iv = self._provider.data_cipher.get_counter_iv()
+        encrypt_key, encrypt_iv = self._provider.wrap_data_key(data_key, data_iv)
+        key = EnvelopeKey(os.urandom(8), data_key, data_iv, encrypt_key, encrypt_iv, self._object_blocks)
+        self._current = key
+        if self._on_rotate is not None:
+            self._on_rotate(key.record())
+        return key
+
+    def _acquire(self):
+        """分配批次密钥和对象序号"""
+        with self._lock:
+            key = self._current
+            if key is None or self._expired(key):
+                key = self.rotate()
+            index = key.count
+            key.count += 1
+            return key, index
+
+    def encrypt(self, data):
+        """
+        加密单个对象
+        Args:
+            data: bytes/str
+
+        Returns:
+            tuple: (16字节对象头, 密文)
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if len(data) > self._max_object_size:
+            raise CryptoException('object is larger than the counter space reserved per object')
+        key, index = self._acquire()
+        return _OBJECT_HEADER.pack(key.key_id, index), key.new_cipher(index).encrypt(data)
+
+    def encrypt_many(self, items):
+        """批量加密, 返回[(对象头, 密文), ...]"""
+        return [self.encrypt(item) for item in items]
+
+
+class BatchEnvelopeDecryptor(object):
+    """
+    批量信封解密, 同一批次的数据密钥只解密一次
+    Examples:
+        >>> decryptor = BatchEnvelopeDecryptor(provider, key_loader=load_record)
+        >>> plaintext = decryptor.decrypt(header, ciphertext)
+    """
+
+    def __init__(self, provider, records=None, key_loader=None):
+        """初始化
+        :param provider(BaseProvider): 主密钥加密类, 用于解密数据密钥
+        :param records(list): 预先加载的批次密钥记录
+        :param key_loader(callable): 遇到未知批次时的回调, 参数为base64格式的key_id, 返回EnvelopeKey.record()
+        """
+        self._provider = provider
+        self._key_loader = key_loader
+        self._lock = threading.Lock()
+        self.keys = {}
+        for record in records or ():
+            self.add_record(record)
+
+    def add_record(self, record):
+        """解密并缓存批次数据密钥"""
+        key_id = base64.b64decode(record["key_id"])
+        encrypt_key = base64.b64decode(record["encrypt_key"])
+        encrypt_iv = base64.b64decode(record["encrypt_iv"])
+        with self._lock:
+            data_key, data_iv = self._provider.unwrap_data_key(encrypt_key, encrypt_iv)
+        key = EnvelopeKey(key_id, data_key, data_iv, encrypt_key, encrypt_iv,
+                          record.get("object_blocks", DEFAULT_OBJECT_BLOCKS))
+        self.keys[key_id] = key
+        return key
+
+    def _get_key(self, key_id):
+        key = self.keys.get(key_id)
+        if key is None:
+            if self._key_loader is None:
+                raise CryptoException('unknown envelope key id: %s' % base64.b64encode(key_id).decode())
+            key = self.add_record(self._key_loader(base64.b64encode(key_id).decode()))
+        return key
+
+    def decrypt(self, header, ciphertext):
+        """
+        解密单个对象
+        Args:
+            header: encrypt返回的对象头
+            ciphertext: 密文
+
+        Returns:
+            bytes: 明文
+        """
+        if len(header) != OBJECT_HEADER_SIZE:
+            raise CryptoException('invalid envelope header')
+        key_id, index = _OBJECT_HEADER.unpack(header)
+        return self._get_key(key_id).new_cipher(index).decrypt(ciphertext)
+
+    def decrypt_many(self, items):
+        """批量解密, items为[(对象头, 密文), ...]"""
+        return [self.decrypt(header, ciphertext) for header, ciphertext in items]
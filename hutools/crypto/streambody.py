@@ -79,7 +79,7 @@ class StreamBody(object):
         os.rename(tmp_file_name, file_name)
 
     def pget_stream_to_file(self, fdst, offset, expected_len, auto_decompress=False):
-        """保存流到本地文件的offset偏移"""
+        """保存流到本地文件的offset偏移, 返回写入的字节数"""
         self._read_len = 0
         fdst.seek(offset, 0)
         chunk_size = 1024 * 1024
@@ -92,3 +92,4 @@ class StreamBody(object):
 
         if not self._use_chunked and not (self._use_encoding and auto_decompress) and self._read_len != expected_len:
             raise IOError("download failed with incomplete file")
+        return self._read_len
@@ -0,0 +1,81 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  test_asyncstreambody.py
+@Time    :  2026/10/20 11:05 AM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  AsyncStreamBody, 使用本地http.server返回gzip压缩的响应
+"""
+import asyncio
+import gzip
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from hutools.crypto import AsyncStreamBody
+
+aiohttp = pytest.importorskip("aiohttp")
+
+PAYLOAD = os.urandom(32 * 1024) + b"hutools" * 4096
+COMPRESSED = gzip.compress(PAYLOAD)
+
+
+class GzipHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = COMPRESSED if self.path == "/gzip" else PAYLOAD
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/gzip":
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), GzipHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = "http://127.0.0.1:%d" % httpd.server_address[1]
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+async def _aiohttp_download(url, file_name, **session_kwargs):
+    async with aiohttp.ClientSession(**session_kwargs) as session:
+        async with session.get(url) as rt:
+            await AsyncStreamBody(rt).astream_to_file(file_name)
+
+
+def test_aiohttp_gzip_response(server, tmp_path):
+    # aiohttp默认自动解压, 收到的字节数与Content-Length(压缩后)不一致, 不能判定为不完整
+    target = str(tmp_path / "gzip.bin")
+    asyncio.run(_aiohttp_download(server.url + "/gzip", target))
+    with open(target, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_aiohttp_gzip_response_raw(server, tmp_path):
+    target = str(tmp_path / "gzip_raw.bin")
+    asyncio.run(_aiohttp_download(server.url + "/gzip", target, auto_decompress=False))
+    with open(target, "rb") as f:
+        assert f.read() == COMPRESSED
+
+
+def test_aiohttp_plain_response(server, tmp_path):
+    target = str(tmp_path / "plain.bin")
+    asyncio.run(_aiohttp_download(server.url + "/plain", target))
+    with open(target, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert os.listdir(str(tmp_path)) == ["plain.bin"]
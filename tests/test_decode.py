@@ -0,0 +1,45 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  test_decode.py
+@Time    :  2026/10/21 02:30 PM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  decode.bin与源转换表tools/decode_table.py一致
+"""
+import os
+import runpy
+
+import pytest
+
+from hutools.core import decode
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+
+
+@pytest.fixture(scope="module")
+def codes():
+    return runpy.run_path(os.path.join(TOOLS_DIR, "decode_table.py"))["codes"]
+
+
+def test_table_is_up_to_date(codes):
+    build = runpy.run_path(os.path.join(TOOLS_DIR, "build_decode_table.py"))["build"]
+    with open(decode._TABLE_FILE, "rb") as f:
+        assert f.read() == build(codes)
+
+
+def test_lookup_full_bmp(codes):
+    assert len(codes) == 0x10000
+    for codepoint, expected in enumerate(codes):
+        assert decode.lookup(codepoint) == expected, hex(codepoint)
+    assert decode.lookup(0x10000) is None
+    assert decode.codes == codes
+
+
+def test_unidecode_full_bmp(codes):
+    for start in range(0, 0x10000, 0x1000):
+        text = "".join(chr(codepoint) for codepoint in range(start, start + 0x1000))
+        assert decode.unidecode(text) == "".join(codes[start:start + 0x1000]), hex(start)
+    assert decode.unidecode_many(["ah 啊哈哈", "\U0001F600x"]) == [decode.unidecode("ah 啊哈哈"), "x"]
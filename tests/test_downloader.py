@@ -0,0 +1,161 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  test_downloader.py
+@Time    :  2026/10/20 10:20 AM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  RangeDownloader, 使用本地支持Range请求的http.server
+"""
+import base64
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from hutools.crypto import AESCTRCipher, AESProvider, RangeDownloader
+from hutools.crypto.crypto import iv_to_big_int, random_iv, random_key
+
+PAYLOAD = os.urandom(100 * 1024 + 7)
+ETAG = '"payload-v1"'
+PART_SIZE = 16 * 1024
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _headers(self, status, length, extra=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(length))
+        self.send_header("ETag", self.server.etag)
+        self.send_header("Accept-Ranges", "bytes")
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._headers(200, len(self.server.payload))
+
+    def do_GET(self):
+        payload = self.server.payload
+        matched = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        if not matched:
+            self._headers(200, len(payload))
+            self.wfile.write(payload)
+            return
+        start, end = int(matched.group(1)), int(matched.group(2))
+        with self.server.lock:
+            self.server.requests.append((start, end))
+            fail = start in self.server.fail_starts
+        if fail:
+            self._headers(500, 0)
+            return
+        if_match = self.headers.get("If-Match")
+        if if_match is not None and if_match != self.server.etag:
+            self._headers(412, 0)
+            return
+        shift = self.server.range_shift
+        body = payload[start + shift:end + shift + 1]
+        content_range = "bytes %d-%d/%d" % (start + shift, end + shift, len(payload))
+        self._headers(206, len(body), {"Content-Range": content_range})
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    httpd.payload = PAYLOAD
+    httpd.etag = ETAG
+    httpd.lock = threading.Lock()
+    httpd.requests = []
+    httpd.fail_starts = set()
+    httpd.range_shift = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = "http://127.0.0.1:%d/object" % httpd.server_address[1]
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_plain_download(server, tmp_path):
+    target = str(tmp_path / "plain.bin")
+    size = RangeDownloader(server.url, num_threads=4, part_size=PART_SIZE).download(target)
+    assert size == len(PAYLOAD)
+    with open(target, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert len(server.requests) == -(-len(PAYLOAD) // PART_SIZE)
+    assert os.listdir(str(tmp_path)) == ["plain.bin"]
+
+
+def test_encrypted_download(server, tmp_path):
+    data_key, data_iv = random_key(32), random_iv()
+    cipher = AESCTRCipher()
+    cipher.new_cipher(data_key, iv_to_big_int(data_iv))
+    server.payload = cipher.encrypt(PAYLOAD)
+    provider = AESProvider(aes_key=base64.b64encode(random_key(32)))
+    encrypt_key, encrypt_iv = provider.wrap_data_key(data_key, data_iv)
+
+    target = str(tmp_path / "decrypted.bin")
+    RangeDownloader(server.url, num_threads=4, part_size=PART_SIZE).download(
+        target, provider=provider, encrypt_key=encrypt_key, encrypt_iv=encrypt_iv)
+    with open(target, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_resume_after_failure(server, tmp_path):
+    target = str(tmp_path / "resumed.bin")
+    checkpoint = target + ".cpt"
+    ranges = RangeDownloader(server.url, part_size=PART_SIZE).split_ranges(len(PAYLOAD))
+    failed_start = ranges[2][0]
+    server.fail_starts.add(failed_start)
+
+    downloader = RangeDownloader(server.url, num_threads=1, part_size=PART_SIZE, retries=0)
+    with pytest.raises(IOError):
+        downloader.download(target, resumable=True)
+    assert os.path.exists(checkpoint)
+    assert os.path.exists(target + ".download")
+    assert not os.path.exists(target)
+
+    server.fail_starts.clear()
+    first_attempt = set(server.requests)
+    del server.requests[:]
+    assert downloader.download(target, resumable=True) == len(PAYLOAD)
+    with open(target, "rb") as f:
+        assert f.read() == PAYLOAD
+    # 上次已完成的分片直接复用, 不再请求
+    completed = first_attempt - {ranges[2]}
+    assert completed
+    assert not completed & set(server.requests)
+    assert ranges[2] in server.requests
+    assert not os.path.exists(checkpoint)
+    assert not os.path.exists(target + ".download")
+
+
+def test_etag_mismatch(server, tmp_path):
+    target = str(tmp_path / "etag.bin")
+    downloader = RangeDownloader(server.url, num_threads=2, part_size=PART_SIZE, retries=0)
+    original_info = downloader.get_object_info
+    # 对象在获取信息之后被替换
+    downloader.get_object_info = lambda: (original_info()[0], '"payload-v0"')
+    with pytest.raises(IOError, match="412"):
+        downloader.download(target)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_unexpected_content_range(server, tmp_path):
+    server.range_shift = 16
+    server.payload = PAYLOAD + b"\0" * 16
+    target = str(tmp_path / "shifted.bin")
+    downloader = RangeDownloader(server.url, num_threads=1, part_size=PART_SIZE, retries=0)
+    downloader.get_object_info = lambda: (len(PAYLOAD), ETAG)
+    with pytest.raises(IOError, match="Content-Range"):
+        downloader.download(target)
+    assert os.listdir(str(tmp_path)) == []
@@ -0,0 +1,66 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  test_jsonextractor.py
+@Time    :  2026/10/21 10:10 AM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  JsonExtractor.iter_ndjson, 多进程与单进程的结果一致
+"""
+import json
+
+import pytest
+
+from hutools.core.processor import JsonHand
+
+PATHS = {
+    "values": "$.a[?(@.v > 1)].v",
+    "first": "$.a[0].v",
+    "urls": "$..url",
+    "names": "$.a[*].name",
+}
+
+
+def big(value):
+    return value > 1
+
+
+@pytest.fixture
+def ndjson(tmp_path):
+    target = tmp_path / "feed.ndjson"
+    with open(str(target), "w", encoding="utf-8") as f:
+        for i in range(250):
+            doc = {"a": [{"v": i % 4, "name": "n%d" % i}, {"v": i % 3, "url": "u%d" % i}]}
+            f.write(json.dumps(doc) + "\n")
+            if i % 50 == 0:
+                f.write("\n")
+    return str(target)
+
+
+def test_processes_match_serial(ndjson):
+    extractor = JsonHand.extractor(PATHS)
+    serial = list(extractor.iter_ndjson(ndjson, processes=1))
+    pooled = list(extractor.iter_ndjson(ndjson, processes=2, chunk_size=16))
+    assert len(serial) == 250
+    assert pooled == serial
+
+
+def test_processes_match_serial_first(ndjson):
+    extractor = JsonHand.extractor(PATHS, first=True, default="-")
+    assert extractor.ndjson_columns(ndjson, processes=2, chunk_size=7) == extractor.ndjson_columns(ndjson)
+
+
+def test_caller_function_serial(ndjson):
+    extractor = JsonHand.extractor({"x": "$.a[?(big(@.v))].v"})
+    rows = list(extractor.iter_ndjson(ndjson, processes=1))
+    assert rows[2] == {"x": [2, 2]}
+    assert rows[0] == {"x": False}
+
+
+def test_caller_function_processes(ndjson):
+    # 调用方模块中的函数在子进程中不可用, 直接拒绝而不是返回与单进程不同的结果
+    extractor = JsonHand.extractor({"ok": "$.a[0].v", "x": "$.a[0,?(big(@.v))].v"})
+    with pytest.raises(ValueError, match="eval"):
+        list(extractor.iter_ndjson(ndjson, processes=2))
@@ -0,0 +1,96 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  test_jsonpath.py
+@Time    :  2026/10/21 03:20 PM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  JsonHand.find/JsonHand.compile, 预编译表达式的匹配顺序及结果格式
+"""
+import pytest
+
+from hutools.core.processor import JsonHand
+
+BOOKS = [
+    {"category": "reference", "author": "Nigel Rees", "title": "Sayings of the Century", "price": 8.95},
+    {"category": "fiction", "author": "Evelyn Waugh", "title": "Sword of Honour", "price": 12.99},
+    {"category": "fiction", "author": "Herman Melville", "title": "Moby Dick", "isbn": "0-553-21311-3", "price": 8.99},
+    {"category": "fiction", "author": "J. R. R. Tolkien", "title": "The Lord of the Rings", "isbn": "0-395-19395-8",
+     "price": 22.99},
+]
+BICYCLE = {"color": "red", "price": 19.95}
+DATA = {"store": {"book": BOOKS, "bicycle": BICYCLE}, "expensive": 10}
+TITLES = [book["title"] for book in BOOKS]
+
+
+def cheap(price):
+    return price < 10
+
+
+CASES = [
+    # 下标、*、..
+    ("$.store.book[*].author", "VALUE", [book["author"] for book in BOOKS]),
+    ("$..author", "VALUE", [book["author"] for book in BOOKS]),
+    ("$.store.*", "VALUE", [BOOKS, BICYCLE]),
+    ("$.store..price", "VALUE", [8.95, 12.99, 8.99, 22.99, 19.95]),
+    ("$..book[2]", "VALUE", [BOOKS[2]]),
+    ("$.store.bicycle.!", "VALUE", ["color", "price"]),
+    ("$.store.book[9]", "VALUE", False),
+    ("$.nothing", "VALUE", False),
+    # 切片、多选
+    ("$..book[-1:].title", "VALUE", TITLES[-1:]),
+    ("$..book[:2].title", "VALUE", TITLES[:2]),
+    ("$..book[::2].title", "VALUE", TITLES[::2]),
+    ("$..book[1:3].title", "VALUE", TITLES[1:3]),
+    ("$..book[2,0].title", "VALUE", [TITLES[2], TITLES[0]]),
+    ("$..book[0]['title','price']", "VALUE", ["Sayings of the Century", 8.95]),
+    # (expr)、?(expr)
+    ("$..book[(@.length-1)].title", "VALUE", TITLES[-1:]),
+    ("$..book[?(@.isbn)].title", "VALUE", TITLES[2:]),
+    ("$..book[?(!@.isbn)].title", "VALUE", TITLES[:2]),
+    ("$..book[?(@.price < 10)].title", "VALUE", [TITLES[0], TITLES[2]]),
+    ("$..book[?(@.price > 10 && @.category == 'fiction')].author", "VALUE", ["Evelyn Waugh", "J. R. R. Tolkien"]),
+    ("$..book[?(@.category in ('reference', 'poetry') || @.price > 20)].price", "VALUE", [8.95, 22.99]),
+    ("$..book[?(cheap(@.price))].title", "VALUE", [TITLES[0], TITLES[2]]),
+    ("$..book[?([c for c in @.title if c == 'y'])].title", "VALUE", [TITLES[0], TITLES[2]]),
+    # PATH/IPATH
+    ("$..price", "PATH", ["$['store']['book'][0]['price']", "$['store']['book'][1]['price']",
+                          "$['store']['book'][2]['price']", "$['store']['book'][3]['price']",
+                          "$['store']['bicycle']['price']"]),
+    ("$..book[?(@.isbn)]", "PATH", ["$['store']['book'][2]", "$['store']['book'][3]"]),
+    ("$.store.*", "PATH", ["$['store']['book']", "$['store']['bicycle']"]),
+    ("$..*", "PATH", ["$['store']", "$['expensive']", "$['store']['book']", "$['store']['bicycle']"]
+     + ["$['store']['book'][%d]" % i for i in range(4)]
+     + ["$['store']['book'][%d]['%s']" % (i, key) for i, book in enumerate(BOOKS) for key in book]
+     + ["$['store']['bicycle']['color']", "$['store']['bicycle']['price']"]),
+    ("$..book[0,2].title", "IPATH", [["store", "book", "0", "title"], ["store", "book", "2", "title"]]),
+    ("$..bicycle..*", "IPATH", [["store", "bicycle", "color"], ["store", "bicycle", "price"]]),
+]
+
+
+@pytest.mark.parametrize("expr,result_type,expected", CASES)
+def test_find(expr, result_type, expected):
+    assert JsonHand.find(DATA, expr, result_type) == expected
+    assert JsonHand.compile(expr).find(DATA, result_type) == expected
+
+
+@pytest.mark.parametrize("expr,result_type,expected", CASES[:6])
+def test_find_debug(expr, result_type, expected, capsys):
+    assert JsonHand.find(DATA, expr, result_type, debug=1) == expected
+    assert "trace" in capsys.readouterr().out
+
+
+def test_use_eval_disabled():
+    # 白名单内的表达式不需要eval
+    assert JsonHand.find(DATA, "$..book[?(@.price < 10)].title", use_eval=False) == [TITLES[0], TITLES[2]]
+    with pytest.raises(Exception, match="eval disabled"):
+        JsonHand.find(DATA, "$..book[?(cheap(@.price))].title", use_eval=False)
+    with pytest.raises(Exception, match="eval disabled"):
+        JsonHand.find(DATA, "$..book[?([c for c in @.title if c == 'y'])].title", use_eval=False)
+
+
+def test_empty_input():
+    assert JsonHand.find({}, "$..price") is False
+    assert JsonHand.find(DATA, "") is False
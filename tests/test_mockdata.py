@@ -0,0 +1,117 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  test_mockdata.py
+@Time    :  2026/10/21 11:30 AM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  mockdata, 相同种子重跑时输出逐字节一致
+"""
+import csv
+import json
+import os
+
+import pytest
+
+from hutools.core import mockdata
+
+SCHEMA = {
+    "id": "sequence",
+    "age": {"type": "int_number", "min_value": 18, "max_value": 60},
+    "mail": "mail",
+    "mobile": "mobile_number",
+    "name": {"type": "faker", "method": "name"},
+}
+ROWS = 2500
+SHARD_SIZE = 1000
+
+
+def _read_all(paths):
+    contents = []
+    for path in paths:
+        with open(path, "rb") as f:
+            contents.append(f.read())
+    return contents
+
+
+def _ndjson_rows(paths):
+    rows = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            rows.extend(json.loads(line) for line in f)
+    return rows
+
+
+def test_split_shards_remainder():
+    assert mockdata.split_shards(ROWS, SHARD_SIZE) == [(0, 1000, 0), (1, 1000, 1000), (2, 500, 2000)]
+    assert mockdata.split_shards(2000, SHARD_SIZE) == [(0, 1000, 0), (1, 1000, 1000)]
+    assert mockdata.split_shards(0, SHARD_SIZE) == []
+    with pytest.raises(ValueError):
+        mockdata.split_shards(10, 0)
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_pool_matches_serial(tmp_path, fmt):
+    serial = mockdata.write_shards(str(tmp_path / "serial"), SCHEMA, ROWS, seed=2026, fmt=fmt,
+                                   shard_size=SHARD_SIZE, processes=1, batch_size=300)
+    pooled = mockdata.write_shards(str(tmp_path / "pooled"), SCHEMA, ROWS, seed=2026, fmt=fmt,
+                                   shard_size=SHARD_SIZE, processes=3, batch_size=300)
+    assert [os.path.basename(path) for path in serial] == ["part-00000.%s" % fmt, "part-00001.%s" % fmt,
+                                                          "part-00002.%s" % fmt]
+    assert [os.path.basename(path) for path in pooled] == [os.path.basename(path) for path in serial]
+    assert _read_all(pooled) == _read_all(serial)
+
+
+def test_rerun_is_identical(tmp_path):
+    first = mockdata.write_shards(str(tmp_path / "first"), SCHEMA, ROWS, seed=7, shard_size=SHARD_SIZE, processes=2)
+    second = mockdata.write_shards(str(tmp_path / "second"), SCHEMA, ROWS, seed=7, shard_size=SHARD_SIZE, processes=2)
+    other = mockdata.write_shards(str(tmp_path / "other"), SCHEMA, ROWS, seed=8, shard_size=SHARD_SIZE, processes=2)
+    assert _read_all(first) == _read_all(second)
+    assert _read_all(first) != _read_all(other)
+
+
+def test_sequence_continues_across_shards(tmp_path):
+    paths = mockdata.write_shards(str(tmp_path), SCHEMA, ROWS, seed=1, shard_size=SHARD_SIZE, processes=1)
+    rows = _ndjson_rows(paths)
+    assert [row["id"] for row in rows] == list(range(1, ROWS + 1))
+    assert all(18 <= row["age"] <= 60 for row in rows)
+
+
+def test_csv_header(tmp_path):
+    with_header = mockdata.write_shards(str(tmp_path / "header"), SCHEMA, ROWS, seed=1, fmt="csv",
+                                        shard_size=SHARD_SIZE, processes=1)
+    without_header = mockdata.write_shards(str(tmp_path / "plain"), SCHEMA, ROWS, seed=1, fmt="csv",
+                                           shard_size=SHARD_SIZE, processes=1, header=False)
+    for path, plain_path, size in zip(with_header, without_header, (1000, 1000, 500)):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.reader(f))
+        with open(plain_path, "r", encoding="utf-8", newline="") as f:
+            plain_rows = list(csv.reader(f))
+        assert rows[0] == list(SCHEMA)
+        assert rows[1:] == plain_rows
+        assert len(plain_rows) == size
+
+
+def test_main_stdout_header_once(capsys):
+    schema = json.dumps({"id": "sequence", "code": "verify_code"})
+    mockdata.main(["--schema", schema, "--rows", "25", "--seed", "3", "--format", "csv", "--shard-size", "10"])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "id,code"
+    assert len(lines) == 26
+    assert [line.split(",")[0] for line in lines[1:]] == [str(i) for i in range(1, 26)]
+
+    mockdata.main(["--schema", schema, "--rows", "25", "--seed", "3", "--format", "csv", "--shard-size", "10",
+                   "--no-header"])
+    assert capsys.readouterr().out.splitlines() == lines[1:]
+
+
+def test_main_out_matches_write_shards(tmp_path, capsys):
+    schema = {"id": "sequence", "mail": "mail"}
+    mockdata.main(["--schema", json.dumps(schema), "--rows", "25", "--seed", "5", "--shard-size", "10",
+                   "--processes", "3", "--out", str(tmp_path / "cli")])
+    printed = capsys.readouterr().out.split()
+    expected = mockdata.write_shards(str(tmp_path / "api"), schema, 25, seed=5, shard_size=10, processes=1)
+    assert [os.path.basename(path) for path in printed] == [os.path.basename(path) for path in expected]
+    assert _read_all(printed) == _read_all(expected)
@@ -0,0 +1,79 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python 3.9.11
+"""
+@File    :  build_decode_table.py
+@Time    :  2026/10/21 02:10 PM
+@Author  :  YuYanQing
+@Version :  1.0
+@Contact :  mryu168@163.com
+@License :  (C)Copyright 2022-2026
+@Desc    :  由tools/decode_table.py生成hutools/core/decode.bin, 格式见hutools/core/decode.py
+"""
+import argparse
+import json
+import os
+import runpy
+import struct
+import zlib
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_FILE = os.path.join(TOOLS_DIR, "decode_table.py")
+TARGET_FILE = os.path.join(os.path.dirname(TOOLS_DIR), "hutools", "core", "decode.bin")
+
+MAGIC = b"HUTD"
+VERSION = 1
+BLOCK_SIZE = 256
+
+
+def load_codes(source=SOURCE_FILE):
+    """读取源转换表中的codes元组"""
+    return runpy.run_path(source)["codes"]
+
+
+def build(codes):
+    """
+    按decode.bin的格式打包, 相同的codes生成的文件逐字节一致
+    Args:
+        codes: 转换表, 长度为BLOCK_SIZE的整数倍
+
+    Returns:
+        bytes
+    """
+    if len(codes) % BLOCK_SIZE:
+        raise ValueError("table size must be a multiple of %d" % BLOCK_SIZE)
+    blocks = [zlib.compress(json.dumps(list(codes[i:i + BLOCK_SIZE]), ensure_ascii=False,
+                                       separators=(",", ":")).encode("utf-8"), 9)
+              for i in range(0, len(codes), BLOCK_SIZE)]
+    offsets = [0]
+    for block in blocks:
+        offsets.append(offsets[-1] + len(block))
+    header = struct.pack(">4sBH", MAGIC, VERSION, len(blocks)) + struct.pack(">%dI" % len(offsets), *offsets)
+    return header + b"".join(blocks)
+
+
+def main(argv=None):
+    """
+    命令行入口
+    Examples:
+        python tools/build_decode_table.py
+        python tools/build_decode_table.py --check
+    """
+    parser = argparse.ArgumentParser(description="生成hutools/core/decode.bin")
+    parser.add_argument("--source", default=SOURCE_FILE, help="源转换表")
+    parser.add_argument("--out", default=TARGET_FILE, help="输出文件")
+    parser.add_argument("--check", action="store_true", help="只检查输出文件是否与源转换表一致")
+    args = parser.parse_args(argv)
+
+    data = build(load_codes(args.source))
+    if args.check:
+        with open(args.out, "rb") as f:
+            if f.read() != data:
+                raise SystemExit("%s is out of date, run python tools/build_decode_table.py" % args.out)
+        return
+    with open(args.out, "wb") as f:
+        f.write(data)
+    print("%s: %d bytes" % (args.out, len(data)))
+
+
+if __name__ == "__main__":
+    main()